@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel to PDF 변환 속도 측정 (오프라인 벤치마크)
+
+로컬 HTTP 서버가 크기, 스크립트 수, 응답 지연을 조절한 가짜 페이지를 제공하고
+그 주소로 채운 통합문서를 만든 뒤 엔진을 헤드리스로 돌려 작업자 수/렌더링 엔진별로
+분당 처리 링크 수, 크롬 프로세스 트리의 최대 메모리(RSS), 링크별 소요 시간 백분위를 비교한다.
+외부 네트워크 없이 동작하므로 변경 전후 성능 비교에 사용:
+
+    python excel_to_pdf_bench.py --links 60 --workers 1 2 4 --engines selenium cdp
+"""
+
+import sys
+import os
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+import psutil
+import openpyxl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from excel_to_pdf_engine import ConversionEngine, DEFAULT_SETTINGS, setup_logging
+
+BENCH_ACCOUNT = "bench@localhost"
+
+
+class SyntheticPageHandler(BaseHTTPRequestHandler):
+    """가짜 페이지와 스크립트 응답
+
+    /page/<번호>?kb=200&scripts=5&latency=100&script_latency=50
+    - kb: 본문 표 크기 (KB)
+    - scripts: 외부 스크립트 수 (네트워크 유휴 대기 측정용)
+    - latency / script_latency: 페이지 / 스크립트 응답 지연 (ms)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if parsed.path.startswith("/page/"):
+            self.send_page(parsed.path.rsplit("/", 1)[-1], params)
+        elif parsed.path.startswith("/script/"):
+            time.sleep(int(params.get("latency", 0)) / 1000)
+            self.respond(200, "application/javascript",
+                         b"document.body.dataset.loaded = (+document.body.dataset.loaded || 0) + 1;")
+        else:
+            self.respond(404, "text/plain", b"not found")
+
+    def send_page(self, number, params):
+        time.sleep(int(params.get("latency", 0)) / 1000)
+        kb = int(params.get("kb", 100))
+        scripts = int(params.get("scripts", 0))
+        script_latency = params.get("script_latency", "0")
+
+        # 한 행이 약 100바이트인 표로 본문 크기를 맞춤
+        rows = "".join(f"<tr><td>{number}-{i}</td><td>{'가' * 20}</td><td>{i * 7919 % 10007}</td></tr>"
+                       for i in range(kb * 10))
+        tags = "".join(f'<script src="/script/{number}-{i}.js?latency={script_latency}"></script>'
+                       for i in range(scripts))
+        body = (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>page {number}</title></head>"
+                f"<body><h1>벤치마크 페이지 {number}</h1><table>{rows}</table>{tags}</body></html>")
+        self.respond(200, "text/html; charset=utf-8", body.encode("utf-8"))
+
+    def respond(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_page_server():
+    """빈 포트에 가짜 페이지 서버를 띄우고 (서버, 기본 주소) 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SyntheticPageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_workbook(path, base_url, links, sheets, page_args):
+    """A열에 가짜 페이지 주소를 채운 통합문서 생성 (시트별로 고르게 나눔)"""
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    query = "&".join(f"{key}={value}" for key, value in page_args.items())
+    for sheet_index in range(sheets):
+        ws = wb.create_sheet(f"시트{sheet_index + 1}")
+        ws.append(["링크"])
+        for number in range(sheet_index, links, sheets):
+            ws.append([f"{base_url}/page/{number}?{query}"])
+    wb.save(path)
+    return wb.sheetnames
+
+
+class RssSampler:
+    """이 프로세스의 자식 프로세스(크롬, 크롬드라이버) 전체 RSS 최대값 측정"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        me = psutil.Process(os.getpid())
+        while not self.stop_event.is_set():
+            total = 0
+            for child in me.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            self.peak = max(self.peak, total)
+            self.stop_event.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def run_case(workbook, sheet_names, engine_name, workers, work_dir, logger, base_settings):
+    """한 조합(렌더링 엔진, 작업자 수)을 실행하고 결과 반환"""
+    settings = dict(base_settings, renderer=engine_name, worker_count=workers)
+    case_dir = os.path.join(work_dir, f"{engine_name}_{workers}")
+    output = os.path.join(case_dir, "pdf")
+    os.makedirs(output)
+
+    # 실제 계정 프로필을 건드리지 않도록 빈 프로필을 임시 폴더에 둠
+    engine = ConversionEngine(settings, case_dir, logger, profile_root=os.path.join(work_dir, "profiles"))
+    with RssSampler() as sampler:
+        summary = engine.run(workbook, sheet_names, "A", BENCH_ACCOUNT, output, headless=True)
+
+    total = summary['phases'].get('total', {})
+    return {
+        'engine': engine_name,
+        'workers': workers,
+        'success': summary['success'],
+        'failed': summary['failed'],
+        'elapsed': round(summary['elapsed'], 2),
+        'links_per_minute': round(summary['pages_per_minute'], 1),
+        'peak_rss_mb': round(sampler.peak / 1024 / 1024, 1),
+        'latency_p50': total.get('p50'),
+        'latency_p95': total.get('p95'),
+        'latency_p99': total.get('p99'),
+        'requests': summary['requests'],
+        'phases': summary['phases'],
+    }
+
+
+def format_table(results):
+    """결과 표 문자열"""
+    header = f"{'엔진':<10}{'작업자':>6}{'성공':>6}{'실패':>6}{'링크/분':>10}{'최대 RSS(MB)':>14}{'p50':>8}{'p95':>8}{'p99':>8}"
+    lines = [header, "-" * 76]
+    for r in results:
+        p = [f"{r[key]:.2f}" if r[key] is not None else "-" for key in ('latency_p50', 'latency_p95', 'latency_p99')]
+        lines.append(f"{r['engine']:<10}{r['workers']:>6}{r['success']:>6}{r['failed']:>6}"
+                     f"{r['links_per_minute']:>10}{r['peak_rss_mb']:>14}{p[0]:>8}{p[1]:>8}{p[2]:>8}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Excel to PDF 오프라인 변환 속도 측정")
+    parser.add_argument("--links", type=int, default=40, help="링크 수 (기본 40)")
+    parser.add_argument("--sheets", type=int, default=2, help="시트 수 (기본 2)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="비교할 작업자 수")
+    parser.add_argument("--engines", nargs="+", default=["selenium"], choices=["selenium", "cdp"],
+                        help="비교할 렌더링 엔진")
+    parser.add_argument("--page-kb", type=int, default=100, help="페이지 본문 크기 (KB)")
+    parser.add_argument("--scripts", type=int, default=3, help="페이지당 외부 스크립트 수")
+    parser.add_argument("--latency", type=int, default=50, help="페이지 응답 지연 (ms)")
+    parser.add_argument("--script-latency", type=int, default=100, help="스크립트 응답 지연 (ms)")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="호스트 속도 제한을 켜고 측정 (기본은 꺼서 렌더링 속도만 측정)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--keep", action="store_true", help="생성한 통합문서와 PDF를 지우지 않음")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix="excel_to_pdf_bench_")
+    logger = setup_logging(os.path.join(work_dir, "logs"))
+
+    base_settings = dict(DEFAULT_SETTINGS,
+                         headless=True,
+                         resume_completed=False,
+                         pdf_cache=False,
+                         sheets_fast_path=False,
+                         retry_max_attempts=1,
+                         # 속도 제한(시작 초당 2회)이 켜져 있으면 작업자 수와 관계없이 제한값이 측정됨
+                         rate_limit=args.rate_limit,
+                         ready_selectors={})
+
+    server, base_url = start_page_server()
+    results = []
+    try:
+        workbook = os.path.join(work_dir, "bench.xlsx")
+        page_args = {"kb": args.page_kb, "scripts": args.scripts,
+                     "latency": args.latency, "script_latency": args.script_latency}
+        sheet_names = build_workbook(workbook, base_url, args.links, args.sheets, page_args)
+        logger.info(f"벤치마크 시작: 링크 {args.links}개, 작업 폴더 {work_dir}")
+
+        for engine_name in args.engines:
+            for workers in args.workers:
+                logger.info(f"측정: {engine_name}, 작업자 {workers}개")
+                results.append(run_case(workbook, sheet_names, engine_name, workers,
+                                        work_dir, logger, base_settings))
+    finally:
+        server.shutdown()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+    return 1 if any(r['failed'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
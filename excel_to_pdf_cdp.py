@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel to PDF 변환 엔진 - CDP 렌더러 (asyncio)
+
+Selenium 없이 DevTools 웹소켓으로 크롬과 직접 통신한다.
+크롬 하나에 탭(Target.createTarget) 여러 개를 띄워 페이지를 동시에 열고
+인쇄하므로, 작업자마다 크롬을 하나씩 띄우는 Selenium 방식보다 메모리를
+훨씬 적게 쓴다. 엔진에서는 settings["renderer"] = "cdp" 로 선택하며
+SeleniumRenderer 와 같은 인터페이스(convert_to_pdf 등)를 제공한다.
+
+websockets 패키지가 필요하다 (pip install websockets).
+"""
+
+import os
+import time
+import json
+import base64
+import shutil
+import asyncio
+import logging
+import tempfile
+import threading
+import subprocess
+import concurrent.futures
+from urllib.parse import urlparse
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from excel_to_pdf_engine import (PRINT_OPTIONS, AccessDeniedError, ConversionError, PhaseTimer,
+                                 ProcessTree, RecyclePolicy, THROTTLE_STATUSES,
+                                 ACCESS_DENIED_HOSTS, ACCESS_DENIED_MARKERS, LEAN_BROWSER_ARGS,
+                                 classify_error, check_http_status, blocked_url_patterns)
+
+# 크롬 실행 파일 후보 (chrome_path 설정이 없을 때)
+CHROME_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+]
+
+
+class CdpError(Exception):
+    """CDP 명령 실패"""
+
+
+def find_chrome(path=None):
+    """크롬 실행 파일 경로"""
+    for candidate in ([path] if path else []) + CHROME_CANDIDATES:
+        if os.path.isfile(candidate):
+            return candidate
+        found = shutil.which(candidate)
+        if found:
+            return found
+    raise FileNotFoundError("크롬 실행 파일을 찾을 수 없습니다 (settings.json 의 chrome_path 지정)")
+
+
+class CdpConnection:
+    """DevTools 웹소켓 연결 하나 (flatten 세션으로 여러 탭 공유)"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.next_id = 0
+        self.pending = {}
+        self.listeners = {}
+        self.reader = None
+
+    async def start(self):
+        self.reader = asyncio.ensure_future(self._read_loop())
+
+    async def send(self, method, params=None, session_id=None):
+        self.next_id += 1
+        message = {"id": self.next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        await self.ws.send(json.dumps(message))
+        return await future
+
+    def listen(self, session_id, callback):
+        self.listeners[session_id] = callback
+
+    def unlisten(self, session_id):
+        self.listeners.pop(session_id, None)
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self.pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    callback = self.listeners.get(message.get("sessionId"))
+                    if callback:
+                        callback(message.get("method", ""), message.get("params", {}))
+        except Exception:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("DevTools 연결이 끊어졌습니다"))
+            self.pending.clear()
+
+    async def close(self):
+        await self.ws.close()
+        if self.reader:
+            await self.reader
+
+
+class CdpTab:
+    """브라우저 탭 하나 (페이지 로딩, 준비 대기, 인쇄)"""
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, conn, target_id, session_id):
+        self.conn = conn
+        self.target_id = target_id
+        self.session_id = session_id
+        self.inflight = set()
+        self.document_status = None
+        self.throttled = 0
+        self.requests = 0
+        self.blocked = 0
+        self.pages = 0
+        conn.listen(session_id, self._on_event)
+
+    def _on_event(self, method, params):
+        """CDP Network 이벤트로 진행 중인 요청과 본문 응답 코드 추적"""
+        if method == "Network.requestWillBeSent":
+            self.inflight.add(params.get("requestId"))
+            self.requests += 1
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.inflight.discard(params.get("requestId"))
+            if params.get("blockedReason") == "inspector":
+                self.blocked += 1
+        elif method == "Network.responseReceived":
+            code = params.get("response", {}).get("status")
+            if code in THROTTLE_STATUSES:
+                self.throttled += 1
+            if params.get("type") == "Document" and self.document_status is None:
+                self.document_status = code
+
+    async def send(self, method, **params):
+        return await self.conn.send(method, params, self.session_id)
+
+    async def evaluate(self, expression):
+        result = await self.send("Runtime.evaluate", expression=expression, returnByValue=True)
+        if "exceptionDetails" in result:
+            raise CdpError(f"스크립트 오류: {expression}")
+        return result.get("result", {}).get("value")
+
+    async def navigate(self, url):
+        self.inflight.clear()
+        self.document_status = None
+        self.throttled = 0
+        self.requests = 0
+        self.blocked = 0
+        result = await self.send("Page.navigate", url=url)
+        if result.get("errorText"):
+            raise CdpError(f"페이지 이동 실패: {result['errorText']}")
+
+    async def wait_ready(self, url, readiness):
+        """PageReadiness 와 같은 기준으로 준비 완료 대기 (이벤트는 웹소켓으로 수신)
+        
+        반환값은 본문 응답 상태 코드
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + readiness.timeout
+        selector = readiness.selector_for(url)
+        idle_since = None
+        document_ready = False
+        selector_ready = selector is None
+
+        while True:
+            now = loop.time()
+            if not document_ready:
+                document_ready = await self.evaluate("document.readyState") == "complete"
+            if document_ready and (self.document_status or 0) >= 400:
+                return self.document_status
+            if document_ready and not selector_ready:
+                selector_ready = await self.evaluate(
+                    f"document.querySelector({json.dumps(selector)}) !== null")
+
+            if len(self.inflight) <= readiness.max_inflight:
+                if idle_since is None:
+                    idle_since = now
+            else:
+                idle_since = None
+            network_idle = idle_since is not None and now - idle_since >= readiness.idle_time
+
+            if document_ready and selector_ready and network_idle:
+                return self.document_status
+
+            if now >= deadline:
+                if document_ready and selector_ready:
+                    readiness.logger.warning(f"네트워크 유휴 대기 시간 초과, 그대로 인쇄: {url} (진행 중 요청 {len(self.inflight)}개)")
+                    return self.document_status
+                missing = "readyState" if not document_ready else f"선택자 {selector}"
+                raise TimeoutError(f"페이지 준비 시간 초과 ({readiness.timeout}초, {missing})")
+
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def check_access(self):
+        """로그인/권한 요청 페이지면 AccessDeniedError"""
+        href = await self.evaluate("location.href") or ""
+        host = (urlparse(href).hostname or "").lower()
+        if host in ACCESS_DENIED_HOSTS:
+            raise AccessDeniedError(f"로그인 페이지로 이동됨: {href}")
+        text = await self.evaluate(
+            "document.body ? document.body.innerText.slice(0, 2000) : ''") or ""
+        for marker in ACCESS_DENIED_MARKERS:
+            if marker in text:
+                raise AccessDeniedError(f"접근 권한 없음 ({marker})")
+
+    async def close(self):
+        self.conn.unlisten(self.session_id)
+        await self.conn.send("Target.closeTarget", {"targetId": self.target_id})
+
+    async def print_to_file(self, pdf_path, chunk_size, timer=None):
+        """printToPDF 스트림을 임시 파일에 조각씩 기록한 뒤 이름 변경, 바이트 수 반환"""
+        folder, name = os.path.split(pdf_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=folder)
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                result = await self.send("Page.printToPDF",
+                                         **dict(PRINT_OPTIONS, transferMode="ReturnAsStream"))
+                if timer:
+                    timer.lap("print")
+                handle = result["stream"]
+                try:
+                    while True:
+                        chunk = await self.send("IO.read", handle=handle, size=chunk_size)
+                        data = chunk.get("data", "")
+                        data = base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("latin-1")
+                        f.write(data)
+                        written += len(data)
+                        if chunk.get("eof"):
+                            break
+                finally:
+                    await self.send("IO.close", handle=handle)
+            os.replace(temp_path, pdf_path)
+            if timer:
+                timer.lap("write")
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return written
+
+
+class CdpBrowser:
+    """DevTools 포트를 연 크롬 프로세스 하나"""
+
+    STARTUP_TIMEOUT = 30
+
+    def __init__(self, process, conn, profile_dir, blocked_urls=()):
+        self.process = process
+        self.conn = conn
+        self.profile_dir = profile_dir
+        self.blocked_urls = list(blocked_urls)  # 새 탭마다 적용할 차단 주소 패턴
+        self.tree = ProcessTree(process.pid)
+
+    @classmethod
+    async def launch(cls, profile_dir, chrome_path=None, headless=True, extra_args=(), blocked_urls=()):
+        if websockets is None:
+            raise RuntimeError("cdp 렌더러를 사용하려면 websockets 패키지가 필요합니다 (pip install websockets)")
+
+        # 포트 0 으로 열면 크롬이 빈 포트를 골라 DevToolsActivePort 파일에 기록
+        port_file = os.path.join(profile_dir, "DevToolsActivePort")
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        args = [
+            find_chrome(chrome_path),
+            f"--user-data-dir={profile_dir}",
+            "--remote-debugging-port=0",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+        ]
+        if headless:
+            args.append("--headless=new")
+        args.extend(extra_args)
+        args.append("about:blank")
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + cls.STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"크롬이 바로 종료되었습니다 (종료 코드 {process.returncode})")
+            try:
+                with open(port_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                process.kill()
+                raise TimeoutError("크롬 DevTools 포트를 열지 못했습니다")
+            await asyncio.sleep(0.1)
+
+        ws = await websockets.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}",
+                                      max_size=None, ping_interval=None)
+        conn = CdpConnection(ws)
+        await conn.start()
+        return cls(process, conn, profile_dir, blocked_urls)
+
+    async def new_tab(self):
+        target = await self.conn.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.conn.send("Target.attachToTarget",
+                                        {"targetId": target["targetId"], "flatten": True})
+        tab = CdpTab(self.conn, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        await tab.send("Network.enable")
+        if self.blocked_urls:
+            await tab.send("Network.setBlockedURLs", urls=self.blocked_urls)
+        await tab.send("Runtime.enable")
+        return tab
+
+    async def close(self):
+        # 종료 후에는 부모 관계가 끊길 수 있어 자손 목록을 먼저 잡아 둠
+        procs = self.tree.processes()
+        try:
+            await asyncio.wait_for(self.conn.send("Browser.close"), 5)
+        except Exception:
+            pass
+        try:
+            await self.conn.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        ProcessTree.kill(procs)
+
+
+class CdpRenderer:
+    """크롬 하나와 탭 풀로 PDF 를 만드는 렌더러
+
+    이벤트 루프는 전용 스레드에서 돌고, convert_to_pdf 는 여러 작업자
+    스레드에서 동시에 호출할 수 있다 (빈 탭이 생길 때까지 대기).
+    인터페이스는 excel_to_pdf_engine.SeleniumRenderer 와 같다.
+    페이지 수 기준에 걸린 탭은 반납할 때 닫고 새 탭으로 바꾸고, 메모리는 브라우저 전체
+    (공용 프로세스 포함) 기준이라 recycle_reason 으로 알려 작업자가 크롬을 새로 띄우게 한다.
+    같은 계정의 작업자들이 렌더러 하나를 함께 쓰므로, 메모리 기준으로 재시작할 때는
+    close(drain=True) 로 새 변환을 받지 않고 진행 중인 변환이 끝나기를 기다렸다가 닫는다.
+    그 사이 들어온 변환과 끝내 취소된 변환은 recycled 로 실패해 시도 횟수 없이 다시 처리된다.
+    """
+
+    CALL_TIMEOUT = 60  # 쿠키 조회 등 짧은 명령의 응답 대기 (초)
+    PRINT_TIMEOUT = 120  # 변환 한 건에 페이지 준비 대기 외에 더 허용하는 시간 (탭 대기, 인쇄)
+
+    def __init__(self, profile_dir, tab_count, readiness, settings, logger=None, headless=True):
+        self.profile_dir = profile_dir
+        self.tab_count = max(1, tab_count)
+        self.readiness = readiness
+        self.settings = settings
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.headless = headless
+        self.browser = None
+        self.tabs = None
+        self.policy = RecyclePolicy.from_settings(settings)
+        self.active = set()  # 진행 중인 변환 (닫을 때 취소)
+        self.draining = False  # 재활용을 위해 닫는 중 (새 변환을 받지 않음)
+        self.closed = False
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        try:
+            self._call(self._start(), CdpBrowser.STARTUP_TIMEOUT + self.CALL_TIMEOUT)
+        except Exception:
+            self.close()
+            raise
+
+    def _call(self, coroutine, timeout=None):
+        """이벤트 루프 스레드에서 코루틴을 실행하고 결과 반환
+
+        렌더러가 이미 닫혔거나 실행 중에 닫혀 취소되면 driver_crash (재활용으로 닫았으면
+        recycled), 제한 시간 안에 끝나지 않으면 timeout 으로 실패한다 (작업자 스레드가 무한정
+        멈추지 않도록).
+        """
+        if self.closed:
+            coroutine.close()
+            raise self._stopped_error("크롬(CDP)이 이미 종료됨")
+        timeout = timeout or self.CALL_TIMEOUT
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        done, _ = concurrent.futures.wait([future], timeout)
+        if not done:
+            future.cancel()
+            raise ConversionError("timeout", f"크롬(CDP) 응답 없음 ({timeout}초)")
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise self._stopped_error("크롬(CDP)이 재시작되어 작업이 취소됨") from None
+
+    def _stopped_error(self, message):
+        """닫힌 렌더러에서 실패한 호출의 오류 (재활용이면 시도 횟수에 넣지 않는 recycled)"""
+        return ConversionError("recycled" if self.draining else "driver_crash", message)
+
+    async def _tracked(self, coroutine):
+        """닫을 때 취소할 수 있도록 진행 중인 작업으로 등록해 실행"""
+        task = asyncio.current_task()
+        self.active.add(task)
+        try:
+            return await coroutine
+        finally:
+            self.active.discard(task)
+
+    async def _start(self):
+        self.browser = await CdpBrowser.launch(self.profile_dir,
+                                               chrome_path=self.settings["chrome_path"] or None,
+                                               headless=self.headless,
+                                               extra_args=LEAN_BROWSER_ARGS if self.settings["lean_browser"] else (),
+                                               blocked_urls=blocked_url_patterns(self.settings))
+        self.tabs = asyncio.Queue()
+        for _ in range(self.tab_count):
+            self.tabs.put_nowait(await self.browser.new_tab())
+        self.logger.info(f"크롬(CDP) 시작 - 탭 {self.tab_count}개, 프로필: {self.profile_dir}")
+
+    def convert_to_pdf(self, url, folder, filename, timer=None):
+        """URL을 PDF로 변환 (실패하면 분류된 ConversionError)"""
+        if self.draining:
+            raise ConversionError("recycled", "크롬(CDP) 재활용 중이라 변환을 받지 않음")
+        return self._call(self._tracked(self._convert(url, os.path.join(folder, f"{filename}.pdf"),
+                                                      timer or PhaseTimer())),
+                          self.readiness.timeout + self.PRINT_TIMEOUT)
+
+    async def _convert(self, url, pdf_path, timer):
+        tab = await self.tabs.get()
+        timer.lap("queue_wait")  # 빈 탭을 기다린 시간
+        if self.draining:
+            # 빈 탭을 기다리는 사이 재활용이 시작됨
+            self.tabs.put_nowait(tab)
+            raise ConversionError("recycled", "크롬(CDP) 재활용 중이라 변환을 받지 않음")
+        try:
+            await tab.navigate(url)
+            timer.lap("navigate")
+            try:
+                status = await tab.wait_ready(url, self.readiness)  # 페이지 준비 완료 대기
+            finally:
+                timer.throttled = tab.throttled
+                timer.requests = tab.requests
+                timer.blocked = tab.blocked
+            check_http_status(status)
+            await tab.check_access()
+            timer.lap("ready")
+            await tab.print_to_file(pdf_path, self.settings["pdf_stream_chunk_size"], timer)
+        except ConversionError:
+            raise
+        except Exception as e:
+            # 준비 대기 시간 초과 등은 로그인/권한 페이지 때문일 수 있음
+            try:
+                await tab.check_access()
+            except AccessDeniedError:
+                raise
+            except Exception:
+                pass
+            raise classify_error(e) from e
+        finally:
+            tab.pages += 1
+            if self.browser is not None and not self.closed and not self.draining:
+                reason = self.policy.pages_reason(tab.pages)
+                if reason:
+                    tab = await self._recycle_tab(tab, reason)
+            self.tabs.put_nowait(tab)
+
+    async def _recycle_tab(self, tab, reason):
+        """탭을 닫고 새 탭 반환 (실패하면 기존 탭을 그대로 사용)"""
+        try:
+            new_tab = await self.browser.new_tab()
+        except Exception as e:
+            self.logger.warning(f"탭 재활용 실패: {str(e)}")
+            return tab
+        try:
+            await tab.close()
+        except Exception:
+            pass
+        self.logger.info(f"탭 재활용: {reason}")
+        return new_tab
+
+    def _send(self, method):
+        """브라우저 단위 CDP 명령"""
+        browser = self.browser
+        if browser is None:
+            raise ConversionError("driver_crash", "크롬(CDP)이 이미 종료됨")
+        return self._call(browser.conn.send(method))
+
+    def get_cookies(self):
+        result = self._send("Storage.getCookies")
+        return result.get("cookies", [])
+
+    def user_agent(self):
+        version = self._send("Browser.getVersion")
+        # 헤드리스 표시는 빼고 일반 크롬처럼 보냄
+        return version.get("userAgent", "").replace("HeadlessChrome", "Chrome")
+
+    def recycle_reason(self):
+        """크롬을 새로 띄워야 하면 이유 (메모리 초과, 다른 작업자가 이미 닫은 렌더러)"""
+        browser = self.browser
+        if self.closed or self.draining or browser is None:
+            return "다른 작업자가 크롬(CDP)을 재시작함"
+        return self.policy.memory_reason(browser.tree)
+
+    def close(self, drain=False):
+        """진행 중인 변환을 취소해 끝낸 뒤 크롬과 이벤트 루프 종료
+
+        drain 이면 (재활용) 먼저 새 변환을 막고 진행 중인 변환이 끝나기를 기다린다.
+        변환 한 건의 제한 시간이 지나도 남은 변환만 취소한다.
+        """
+        if self.closed:
+            return
+        if drain:
+            self.draining = True
+            future = asyncio.run_coroutine_threadsafe(self._drain(), self.loop)
+            try:
+                future.result(self.readiness.timeout + self.PRINT_TIMEOUT)
+            except Exception:
+                future.cancel()
+        self.closed = True
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            future.result(self.CALL_TIMEOUT)
+        except Exception:
+            future.cancel()
+        self.browser = None
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+    async def _drain(self):
+        while self.active:
+            await asyncio.wait(list(self.active))
+
+    async def _shutdown(self):
+        tasks = list(self.active)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        browser, self.browser = self.browser, None
+        if browser:
+            try:
+                await browser.close()
+            except Exception:
+                pass
@@ -0,0 +1,883 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel to PDF 분산 변환 (코디네이터 / 작업자)
+
+코디네이터가 통합문서의 링크를 SQLite 작업 큐에 넣고 작은 HTTP 서비스로 나눠 주면
+여러 컴퓨터의 작업자 프로세스가 작업을 임대(lease)로 받아 변환한 뒤 PDF 를 올려 보낸다.
+작업자가 죽거나 연결이 끊겨 임대 기간이 지나면 그 작업은 다시 대기열로 돌아간다.
+결과 PDF 와 실패 목록은 코디네이터 컴퓨터의 출력 폴더에 저장된다.
+
+    # 코디네이터 (폴더, 와일드카드, 여러 파일 가능)
+    python excel_to_pdf_cluster.py coordinator ./월말자료 --output ./pdf --port 8765 --key 비밀키
+
+    # 작업자 (각 컴퓨터에서 실행, 크롬 2개)
+    python excel_to_pdf_cluster.py worker http://코디네이터주소:8765 --account user@gmail.com --workers 2 --key 비밀키
+
+한 컴퓨터에서 시험할 때는 코디네이터를 띄운 뒤 같은 주소(http://127.0.0.1:8765)로
+작업자 프로세스를 여러 개 실행하면 된다.
+"""
+
+import sys
+import os
+import time
+import json
+import hmac
+import base64
+import shutil
+import signal
+import logging
+import sqlite3
+import secrets
+import argparse
+import tempfile
+import threading
+import socket
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+from excel_to_pdf_engine import (CONFIG_DIR, ConversionEngine, ConversionError, PhaseTimer,
+                                 RenderTask, RendererSlot, PdfCache, HostRateLimiter,
+                                 setup_logging, load_settings, load_google_accounts,
+                                 plan_workbook_runs, write_failed_report, extract_link_jobs,
+                                 link_or_copy, move_into_place, retry_delay,
+                                 get_profile_dir, PROFILE_COPY_IGNORE)
+
+# 작업자 인증용 공유 키 (명령줄 --key 가 없을 때)
+KEY_ENV = "EXCEL_TO_PDF_CLUSTER_KEY"
+KEY_HEADER = "X-Cluster-Key"
+
+
+def encode_key(key):
+    """공유 키를 HTTP 헤더 값으로 (한글 등 ASCII 가 아닌 키도 보낼 수 있게 UTF-8 → base64)"""
+    return base64.b64encode(key.encode("utf-8")).decode("ascii")
+
+
+class LeaseQueue:
+    """임대(lease) 방식 작업 큐 (SQLite)
+
+    렌더링 단위(URL)는 tasks, 결과를 받을 행은 jobs 에 둔다. claim 한 작업은 임대 토큰과
+    만료 시각을 받아 leased 가 되고, 만료 전에 complete/fail 하지 않으면 reclaim 이 다시
+    pending 으로 돌린다 (시도 횟수를 다 쓴 작업은 실패 처리). 만료되어 다른 작업자에게 넘어간
+    토큰으로 보낸 결과는 받지 않는다. 같은 출력 폴더로 다시 실행하면 완료된 행은 건너뛴다.
+
+    큐를 열 때마다 새 실행으로 보고 끝나지 않은 이전 행은 stale 로 둔다. 이번 실행에서 add 로
+    다시 넣은 행만 처리하므로, 다른 시트를 골랐거나 URL 이 바뀐 행의 옛 작업은 나가지 않는다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE,
+            url TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            not_before REAL NOT NULL DEFAULT 0,
+            token TEXT,
+            worker TEXT,
+            lease_until REAL,
+            kind TEXT,
+            error TEXT
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            workbook TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            row INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            task_id INTEGER NOT NULL,
+            output_path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            PRIMARY KEY (workbook, sheet, row, url)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_task ON jobs (task_id);
+        CREATE TABLE IF NOT EXISTS denied (
+            task_id INTEGER NOT NULL,
+            account TEXT NOT NULL,
+            PRIMARY KEY (task_id, account)
+        );
+        CREATE TABLE IF NOT EXISTS workers (
+            name TEXT PRIMARY KEY,
+            account TEXT NOT NULL,
+            last_seen REAL NOT NULL
+        );
+    """
+
+    def __init__(self, db_path, lease_seconds=120, max_attempts=3, base_delay=5, max_delay=120):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        # HTTP 요청 스레드들이 함께 쓰므로 연결 하나를 잠금으로 보호 (직접 트랜잭션 관리)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._transaction(self._begin_run)
+
+    @classmethod
+    def from_settings(cls, settings, db_path, lease_seconds=120):
+        return cls(db_path, lease_seconds,
+                   max_attempts=settings["retry_max_attempts"],
+                   base_delay=settings["retry_base_delay"],
+                   max_delay=settings["retry_max_delay"])
+
+    def _transaction(self, work):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def _begin_run(self, conn):
+        """이전 실행의 행과 작업을 이번 실행에서 제외 (add 로 다시 넣은 것만 살아남)"""
+        conn.execute("UPDATE jobs SET status = CASE WHEN status = 'done' THEN 'stale_done' ELSE 'stale' END")
+        conn.execute("UPDATE tasks SET status = 'idle', token = NULL WHERE status != 'done'")
+        conn.execute("DELETE FROM denied")
+
+    def add(self, jobs, output_path, dedupe=True):
+        """작업 등록 (output_path(job) 은 저장 경로), 이전 실행에서 완료되고 PDF도 남은 행은 건너뜀
+
+        반환값은 이번 실행에서 처리할 행 수 (지금까지 add 한 전체)
+        """
+        def work(conn):
+            for job in jobs:
+                key = job.url if dedupe else f"{job.workbook}|{job.sheet}|{job.row}|{job.url}"
+                conn.execute("INSERT OR IGNORE INTO tasks (key, url, status) VALUES (?, ?, 'idle')",
+                             (key, job.url))
+                task_id = conn.execute("SELECT id FROM tasks WHERE key = ?", (key,)).fetchone()[0]
+                path = output_path(job)
+                conn.execute(
+                    "INSERT INTO jobs (workbook, sheet, row, url, task_id, output_path, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 'pending') "
+                    "ON CONFLICT (workbook, sheet, row, url) DO UPDATE SET "
+                    "task_id = excluded.task_id, output_path = excluded.output_path, "
+                    "status = CASE WHEN jobs.status IN ('done', 'stale_done') AND jobs.output_path = excluded.output_path "
+                    "THEN 'done' ELSE 'pending' END",
+                    (job.workbook, job.sheet, job.row, job.url, task_id, path))
+                if not os.path.exists(path):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'pending' WHERE workbook = ? AND sheet = ? AND row = ? AND url = ?",
+                        (job.workbook, job.sheet, job.row, job.url))
+            # 이번 실행의 끝나지 않은 행이 걸린 작업만 (이전 실행에서 실패했어도) 다시 대기열로
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, not_before = 0, token = NULL, "
+                "kind = NULL, error = NULL "
+                "WHERE status != 'pending' AND id IN (SELECT task_id FROM jobs WHERE status = 'pending')")
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+        return self._transaction(work)
+
+    def _untried(self, conn, task_id, now):
+        """최근에 작업을 받아 간(또는 임대를 연장한) 계정 중 이 작업에 권한 없음이 나지 않은 계정 수"""
+        return conn.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT account FROM workers WHERE last_seen >= ?) "
+            "WHERE account NOT IN (SELECT account FROM denied WHERE task_id = ?)",
+            (now - 2 * self.lease_seconds, task_id)).fetchone()[0]
+
+    def _reclaim(self, conn, now):
+        """임대 기간이 지난 작업을 대기열로 돌림 (시도 횟수를 다 썼으면 실패)
+
+        다른 계정에 넘긴 작업은 그 계정의 작업자가 모두 사라졌으면 권한 없음으로 실패 처리한다.
+        """
+        expired = conn.execute(
+            "SELECT id, attempts FROM tasks WHERE status = 'leased' AND lease_until < ?", (now,)).fetchall()
+        for task_id, attempts in expired:
+            if attempts >= self.max_attempts:
+                self._finish(conn, task_id, "failed", "lease_expired", "작업자 응답 없음 (임대 만료)")
+            else:
+                conn.execute("UPDATE tasks SET status = 'pending', token = NULL, worker = NULL WHERE id = ?",
+                             (task_id,))
+
+        denied = conn.execute(
+            "SELECT id, error FROM tasks WHERE status = 'pending' "
+            "AND id IN (SELECT task_id FROM denied)").fetchall()
+        for task_id, error in denied:
+            if not self._untried(conn, task_id, now):
+                self._finish(conn, task_id, "failed", "access_denied", error or "모든 계정 접근 권한 없음")
+        return len(expired)
+
+    def reclaim(self):
+        """만료된 임대 회수, 회수한 작업 수 반환"""
+        return self._transaction(lambda conn: self._reclaim(conn, time.time()))
+
+    def _finish(self, conn, task_id, status, kind=None, error=None):
+        conn.execute("UPDATE tasks SET status = ?, token = NULL, kind = ?, error = ? WHERE id = ?",
+                     (status, kind, error, task_id))
+        conn.execute("UPDATE jobs SET status = ? WHERE task_id = ? AND status = 'pending'", (status, task_id))
+
+    def claim(self, worker, account):
+        """대기 중인 작업 하나를 임대, 없으면 None
+
+        이 계정으로 권한 없음이 났던 작업과 재시도 대기 중인 작업은 건너뛴다.
+        """
+        def work(conn):
+            now = time.time()
+            self._reclaim(conn, now)
+            conn.execute("INSERT OR REPLACE INTO workers (name, account, last_seen) VALUES (?, ?, ?)",
+                         (worker, account, now))
+            row = conn.execute(
+                "SELECT id, url, attempts FROM tasks WHERE status = 'pending' AND not_before <= ? "
+                "AND id NOT IN (SELECT task_id FROM denied WHERE account = ?) ORDER BY id LIMIT 1",
+                (now, account)).fetchone()
+            if row is None:
+                return None
+            task_id, url, attempts = row
+            token = secrets.token_hex(16)
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', token = ?, worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (token, worker, now + self.lease_seconds, task_id))
+            return {"token": token, "url": url, "attempts": attempts + 1,
+                    "lease_seconds": self.lease_seconds}
+        return self._transaction(work)
+
+    def renew(self, token):
+        """임대 연장, 이미 회수되었으면 False"""
+        def work(conn):
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE token = ? AND status = 'leased'",
+                (now + self.lease_seconds, token))
+            # 오래 걸리는 변환 중인 작업자도 살아 있는 계정으로 봄
+            conn.execute("UPDATE workers SET last_seen = ? WHERE name = (SELECT worker FROM tasks WHERE token = ?)",
+                         (now, token))
+            return cursor.rowcount > 0
+        return self._transaction(work)
+
+    def complete(self, token, pdf_path):
+        """올라온 PDF 를 작업의 모든 행 위치에 저장하고 완료 처리, 임대가 없으면 False"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id FROM tasks WHERE token = ? AND status = 'leased'", (token,)).fetchone()
+            if row is None:
+                return False
+            task_id = row[0]
+            outputs = [path for (path,) in self.conn.execute(
+                "SELECT output_path FROM jobs WHERE task_id = ? AND status = 'pending'", (task_id,))]
+
+        # 첫 행은 옮기고 나머지 행은 하드링크/복사
+        for path in outputs[1:]:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            link_or_copy(pdf_path, path)
+        if outputs:
+            os.makedirs(os.path.dirname(outputs[0]), exist_ok=True)
+            move_into_place(pdf_path, outputs[0])
+
+        self._transaction(lambda conn: self._finish(conn, task_id, "done"))
+        return True
+
+    def fail(self, token, account, kind, error):
+        """실패 보고 (일시적 실패는 나중에 재시도, 권한 없음은 다른 계정에 넘김), 임대가 없으면 False"""
+        def work(conn):
+            now = time.time()
+            row = conn.execute(
+                "SELECT id, attempts FROM tasks WHERE token = ? AND status = 'leased'", (token,)).fetchone()
+            if row is None:
+                return False
+            task_id, attempts = row
+
+            if kind == "access_denied":
+                conn.execute("INSERT OR IGNORE INTO denied (task_id, account) VALUES (?, ?)", (task_id, account))
+                # 최근에 작업을 받아 간 계정이 모두 권한이 없으면 실패
+                # (넘긴 뒤 그 계정들이 사라지면 _reclaim 이 실패 처리)
+                if self._untried(conn, task_id, now):
+                    # 다른 계정으로 넘기는 것은 시도 횟수에 넣지 않음
+                    conn.execute("UPDATE tasks SET status = 'pending', token = NULL, attempts = attempts - 1, "
+                                 "kind = ?, error = ? WHERE id = ?", (kind, error, task_id))
+                    return True
+            elif kind == "recycled":
+                # 작업자 쪽 크롬 재활용으로 받지 못한 작업은 시도 횟수에 넣지 않고 바로 다시 내보냄
+                conn.execute("UPDATE tasks SET status = 'pending', token = NULL, attempts = attempts - 1 "
+                             "WHERE id = ?", (task_id,))
+                return True
+            elif kind in ConversionError.TRANSIENT and attempts < self.max_attempts:
+                conn.execute("UPDATE tasks SET status = 'pending', token = NULL, not_before = ?, kind = ?, "
+                             "error = ? WHERE id = ?",
+                             (now + retry_delay(attempts, self.base_delay, self.max_delay), kind, error, task_id))
+                return True
+
+            self._finish(conn, task_id, "failed", kind, error)
+            return True
+        return self._transaction(work)
+
+    def counts(self):
+        """행 상태별 개수 {pending, leased, done, failed} (leased 는 작업자가 처리 중인 행)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN jobs.status = 'pending' AND tasks.status = 'leased' THEN 'leased' "
+                "ELSE jobs.status END, COUNT(*) "
+                "FROM jobs JOIN tasks ON tasks.id = jobs.task_id "
+                "WHERE jobs.status NOT IN ('stale', 'stale_done') GROUP BY 1").fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def finished(self):
+        """남은 작업(대기 또는 처리 중)이 없는지"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0] == 0
+
+    def failed_items(self):
+        """통합문서별 실패 행 목록 {workbook: [{sheet, row, url, kind, error, attempts}]}"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT jobs.workbook, jobs.sheet, jobs.row, jobs.url, tasks.kind, tasks.error, tasks.attempts "
+                "FROM jobs JOIN tasks ON tasks.id = jobs.task_id WHERE jobs.status = 'failed' "
+                "ORDER BY jobs.workbook, jobs.sheet, jobs.row").fetchall()
+        items = {}
+        for workbook, sheet, row, url, kind, error, attempts in rows:
+            items.setdefault(workbook, []).append({
+                'sheet': sheet,
+                'row': row,
+                'url': url,
+                'kind': kind or "other",
+                'error': error or "",
+                'attempts': attempts,
+            })
+        return items
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """작업자 API
+
+    - POST /claim  {"worker", "account"} → 200 작업 / 204 잠시 후 다시 / 410 모두 끝남
+    - POST /renew  {"token"} → 200 / 409 임대 없음
+    - PUT  /result?token=... (본문: PDF) → 200 / 409 임대 없음
+    - POST /fail   {"token", "account", "kind", "error"} → 200 / 409 임대 없음
+    - GET  /status → 행 상태별 개수
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        if urlparse(self.path).path == "/status":
+            self.respond(200, self.server.queue.counts())
+        else:
+            self.respond(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        path = urlparse(self.path).path
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self.respond(400, {"error": "invalid json"})
+            return
+        queue = self.server.queue
+
+        if path == "/claim":
+            task = queue.claim(str(body.get("worker", "")), str(body.get("account", "")))
+            if task:
+                self.respond(200, task)
+            elif queue.finished():
+                self.respond(410, {})
+            else:
+                self.respond(204)
+        elif path == "/renew":
+            self.respond(200 if queue.renew(body.get("token")) else 409, {})
+        elif path == "/fail":
+            ok = queue.fail(body.get("token"), str(body.get("account", "")),
+                            str(body.get("kind", "other")), str(body.get("error", "")))
+            if ok:
+                self.server.logger.warning(f"✗ 실패 보고 [{body.get('kind')}] ({body.get('worker', '')}): "
+                                           f"{body.get('error', '')}")
+            self.respond(200 if ok else 409, {})
+        else:
+            self.respond(404, {"error": "not found"})
+
+    def do_PUT(self):
+        if not self.authorized():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path != "/result":
+            self.respond(404, {"error": "not found"})
+            return
+        token = parse_qs(parsed.query).get("token", [""])[0]
+        length = int(self.headers.get("Content-Length", 0))
+
+        # 본문을 조각씩 임시 파일에 받음 (큰 PDF 도 메모리에 올리지 않음)
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf", dir=self.server.spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            with open(temp_path, 'rb') as f:
+                valid = remaining == 0 and f.read(5) == b"%PDF-"
+            if not valid:
+                self.respond(400, {"error": "invalid pdf"})
+            elif self.server.queue.complete(token, temp_path):
+                self.server.logger.info(f"✓ 결과 수신 ({length // 1024}KB)")
+                self.respond(200, {})
+            else:
+                self.respond(409, {})
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def authorized(self):
+        key = self.server.key
+        if key and not hmac.compare_digest(self.headers.get(KEY_HEADER, "").encode("utf-8"),
+                                           encode_key(key).encode("ascii")):
+            self.respond(403, {"error": "forbidden"})
+            return False
+        return True
+
+    def respond(self, status, data=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8") if data is not None else b""
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Coordinator:
+    """작업 큐를 HTTP 로 나눠 주는 코디네이터 (serve_until_done 으로 끝날 때까지 실행)"""
+
+    CHECK_INTERVAL = 2
+    PROGRESS_INTERVAL = 30
+
+    def __init__(self, queue, host="0.0.0.0", port=8765, key=None, logger=None):
+        self.queue = queue
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.spool_dir = tempfile.mkdtemp(prefix="excel_to_pdf_cluster_")
+        self.server = ThreadingHTTPServer((host, port), CoordinatorHandler)
+        self.server.daemon_threads = True
+        self.server.queue = queue
+        self.server.key = key
+        self.server.spool_dir = self.spool_dir
+        self.server.logger = self.logger
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{socket.gethostname() if host == '0.0.0.0' else host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        self.logger.info(f"코디네이터 시작: {self.address}")
+
+    def serve_until_done(self, stop_event=None):
+        """모든 작업이 완료/실패할 때까지 만료 임대를 회수하며 대기"""
+        last_progress = 0
+        while not (stop_event and stop_event.is_set()):
+            reclaimed = self.queue.reclaim()
+            if reclaimed:
+                self.logger.warning(f"임대 만료 작업 {reclaimed}개 회수")
+            if self.queue.finished():
+                return True
+            now = time.monotonic()
+            if now - last_progress >= self.PROGRESS_INTERVAL:
+                counts = self.queue.counts()
+                self.logger.info(f"진행: 완료 {counts['done']}, 실패 {counts['failed']}, "
+                                 f"처리 중 {counts['leased']}, 대기 {counts['pending']}")
+                last_progress = now
+            time.sleep(self.CHECK_INTERVAL)
+        return False
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+class ClusterClient:
+    """코디네이터 API 호출 (표준 라이브러리 urllib)"""
+
+    def __init__(self, base_url, key=None, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.key = key
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None, content_type="application/json", length=None):
+        headers = {"Content-Type": content_type}
+        if self.key:
+            headers[KEY_HEADER] = encode_key(self.key)
+        if length is not None:
+            headers["Content-Length"] = str(length)
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            if e.code == 403:
+                raise RuntimeError("코디네이터 인증 실패 (--key 확인)") from None
+            return e.code, None
+
+    def _post(self, path, payload):
+        return self._request("POST", path, json.dumps(payload).encode("utf-8"))
+
+    def claim(self, worker, account):
+        """("task", 작업) / ("wait", None) / ("finished", None)"""
+        status, data = self._post("/claim", {"worker": worker, "account": account})
+        if status == 200:
+            return "task", data
+        if status == 410:
+            return "finished", None
+        return "wait", None
+
+    def renew(self, token):
+        return self._post("/renew", {"token": token})[0] == 200
+
+    def upload(self, token, pdf_path):
+        """PDF 업로드, 임대가 이미 회수되었으면 False"""
+        with open(pdf_path, 'rb') as f:
+            status, _ = self._request("PUT", "/result?" + urlencode({"token": token}), f,
+                                      content_type="application/pdf", length=os.path.getsize(pdf_path))
+        if status not in (200, 409):
+            raise ConversionError("network", f"결과 업로드 실패 (HTTP {status})")
+        return status == 200
+
+    def fail(self, token, worker, account, error):
+        payload = {"token": token, "worker": worker, "account": account,
+                   "kind": error.kind, "error": str(error)}
+        return self._post("/fail", payload)[0] == 200
+
+
+class LeaseKeeper:
+    """처리 중인 작업의 임대를 주기적으로 연장 (변환이 임대 기간보다 오래 걸려도 회수되지 않게)"""
+
+    def __init__(self, client, interval, logger=None):
+        self.client = client
+        self.interval = max(1, interval)
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.tokens = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def add(self, token):
+        with self.lock:
+            self.tokens.add(token)
+
+    def remove(self, token):
+        with self.lock:
+            self.tokens.discard(token)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                tokens = list(self.tokens)
+            for token in tokens:
+                try:
+                    if not self.client.renew(token):
+                        self.logger.warning("임대가 이미 회수됨 (결과는 버려질 수 있음)")
+                        self.remove(token)
+                except Exception as e:
+                    self.logger.warning(f"임대 연장 실패: {str(e)}")
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+class ClusterWorker:
+    """코디네이터에서 작업을 받아 변환하고 PDF 를 올려 보내는 작업자 프로세스
+
+    크롬 실행과 재활용, 구글 시트 빠른 경로, PDF 캐시는 ConversionEngine 의 렌더링 경로
+    (RendererSlot)를 그대로 사용한다. 작업자 수만큼 스레드를 띄우고 스레드마다 작업을 하나씩 받는다.
+    """
+
+    POLL_INTERVAL = 2
+
+    def __init__(self, client, account, settings, config_dir=CONFIG_DIR, logger=None,
+                 worker_count=1, headless=True, name=None):
+        self.client = client
+        self.account = account
+        self.settings = settings
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.worker_count = max(1, worker_count)
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.is_running = True
+        self.completed = 0
+        self.failed = 0
+        self.started = 0  # 크롬을 띄우는 데 성공한 스레드 수
+        self.stats_lock = threading.Lock()
+
+        # 같은 컴퓨터에서 작업자 프로세스를 여러 개 띄워도 크롬 프로필 잠금이 겹치지 않도록
+        # 계정 프로필을 이 프로세스 전용 임시 폴더에 복제해서 사용
+        source = get_profile_dir(account)
+        self.profile_root = tempfile.mkdtemp(prefix="excel_to_pdf_worker_profiles_")
+        shutil.copytree(source, os.path.join(self.profile_root, os.path.basename(source)),
+                        ignore=PROFILE_COPY_IGNORE, dirs_exist_ok=True)
+
+        self.engine = ConversionEngine(settings, config_dir, self.logger, profile_root=self.profile_root)
+        self.engine.headless = headless
+        self.engine.spool_dir = tempfile.mkdtemp(prefix="excel_to_pdf_worker_spool_")
+        self.engine.save_folder = self.engine.spool_dir
+        if settings["pdf_cache"]:
+            self.engine.pdf_cache = PdfCache.from_settings(settings, config_dir, self.logger)
+        self.rate_limiter = HostRateLimiter.from_settings(settings, self.logger)
+        self.keeper = None
+
+    def run(self):
+        """작업이 모두 끝나거나 stop 할 때까지 실행"""
+        self.logger.info(f"작업자 시작 - 이름: {self.name}, 계정: {self.account}, "
+                         f"크롬: {self.worker_count}개, 코디네이터: {self.client.base_url}")
+        threads = []
+        try:
+            for index in range(self.worker_count):
+                thread = threading.Thread(target=self.work, args=(index,), daemon=True)
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        finally:
+            self.is_running = False
+            if self.keeper:
+                self.keeper.close()
+            self.engine.cleanup()
+            shutil.rmtree(self.profile_root, ignore_errors=True)
+        self.logger.info(f"작업자 종료 - 완료 {self.completed}개, 실패 {self.failed}개")
+        return self.completed, self.failed
+
+    def stop(self):
+        self.is_running = False
+
+    def work(self, index):
+        slot = RendererSlot(self.engine, self.account, index, self.worker_count)
+        try:
+            slot.start()
+        except Exception as e:
+            self.logger.error(f"작업자 {index + 1} 크롬 드라이버 시작 실패: {str(e)}")
+            return
+        with self.stats_lock:
+            self.started += 1
+
+        while self.is_running:
+            try:
+                slot.prepare()
+            except Exception as e:
+                self.logger.error(f"작업자 {index + 1} 크롬 재시작 실패: {str(e)}")
+                return
+
+            try:
+                state, task = self.client.claim(self.name, self.account)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"코디네이터 연결 실패, 잠시 후 재시도: {str(e)}")
+                time.sleep(self.POLL_INTERVAL)
+                continue
+            if state == "finished":
+                break
+            if state == "wait":
+                time.sleep(self.POLL_INTERVAL)
+                continue
+
+            self.process(slot, task)
+
+    def process(self, slot, task):
+        """임대 받은 작업 하나 변환 후 결과/실패 보고, 실패면 ConversionError 반환"""
+        self.ensure_keeper(task["lease_seconds"])
+        token, url = task["token"], task["url"]
+        self.keeper.add(token)
+        host = (urlparse(url).hostname or "").lower()
+        timer = PhaseTimer()
+        spool_path = None
+        error = None
+        try:
+            # 호스트 속도 제한은 이 작업자 프로세스 안에서만 적용
+            wait = self.rate_limiter.try_acquire(host) if self.rate_limiter else 0
+            while wait and self.is_running:
+                time.sleep(wait)
+                wait = self.rate_limiter.try_acquire(host)
+            spool_path, error = slot.render(RenderTask(url, []), timer)
+            if self.rate_limiter:
+                throttled = timer.throttled > 0 or (error is not None and error.kind == "throttled")
+                self.rate_limiter.release(host, throttled=throttled, healthy=error is None)
+
+            if error is None:
+                if self.client.upload(token, spool_path):
+                    with self.stats_lock:
+                        self.completed += 1
+                    self.logger.info(f"✓ 성공: {url} ({timer.total():.1f}초)")
+                else:
+                    self.logger.warning(f"임대가 회수되어 결과를 버림: {url}")
+            elif error.kind == "recycled":
+                self.client.fail(token, self.name, self.account, error)
+                self.logger.warning(f"크롬 재활용으로 변환하지 못해 다시 대기열로: {url}")
+            else:
+                self.client.fail(token, self.name, self.account, error)
+                with self.stats_lock:
+                    self.failed += 1
+                self.logger.error(f"✗ 실패 [{error.kind}]: {url} - {str(error)}")
+        except (OSError, ValueError, ConversionError) as e:
+            # 보고하지 못한 작업은 임대가 만료되면 코디네이터가 회수
+            self.logger.warning(f"코디네이터에 결과를 보내지 못함: {url} - {str(e)}")
+        finally:
+            self.keeper.remove(token)
+            if spool_path and os.path.exists(spool_path):
+                os.remove(spool_path)
+        return error
+
+    def ensure_keeper(self, lease_seconds):
+        with self.stats_lock:
+            if self.keeper is None:
+                self.keeper = LeaseKeeper(self.client, lease_seconds / 3, self.logger)
+                self.keeper.start()
+
+
+def write_failed_reports(queue, books, logger):
+    """통합문서별 실패 목록(failed_items.json) 저장, {통합문서: 경로} 반환"""
+    paths = {}
+    items_by_book = queue.failed_items()
+    for book in books:
+        items = items_by_book.get(book.excel_path)
+        if items:
+            paths[book.excel_path] = write_failed_report(book.excel_path, book.save_folder, items)
+            logger.info(f"실패 목록 저장: {paths[book.excel_path]}")
+    return paths
+
+
+def run_coordinator(args, settings, logger):
+    books = plan_workbook_runs(args.workbook, args.output, args.sheets)
+    if not books:
+        logger.error(f"처리할 엑셀 파일이 없습니다: {' '.join(args.workbook)}")
+        return 2
+    col = args.col.strip().upper()
+
+    os.makedirs(args.output, exist_ok=True)
+    queue = LeaseQueue.from_settings(settings, os.path.join(args.output, "cluster_queue.sqlite3"), args.lease)
+    try:
+        output_of = {book.excel_path: book.save_folder for book in books}
+        for book in books:
+            # 읽지 못한 통합문서는 기록만 하고 나머지는 계속 처리 (ConversionEngine.run_batch 와 같음)
+            try:
+                sheet_names = book.select_sheets(logger)
+                jobs = extract_link_jobs(book.excel_path, sheet_names, col)
+            except Exception as e:
+                book.error = str(e)
+                logger.error(f"통합문서 읽기 실패: {book.excel_path} - {str(e)}")
+                continue
+            for sheet_name in sheet_names:
+                os.makedirs(os.path.join(book.save_folder, sheet_name), exist_ok=True)
+            book.total = len(jobs)
+            remaining = queue.add(jobs,
+                                  lambda job: os.path.join(output_of[job.workbook], job.sheet, f"row_{job.row}.pdf"),
+                                  dedupe=settings["dedupe_urls"])
+            logger.info(f"{os.path.basename(book.excel_path)}: {len(jobs)}개의 링크 (남은 행 누적 {remaining}개)")
+        if all(book.error for book in books):
+            logger.error("읽을 수 있는 통합문서가 없습니다.")
+            return 2
+
+        if not args.key and args.host not in ("127.0.0.1", "localhost"):
+            logger.warning(f"공유 키 없이 외부에 열려 있습니다. --key 또는 환경 변수 {KEY_ENV} 를 지정하세요.")
+        coordinator = Coordinator(queue, args.host, args.port, args.key, logger)
+        stop_event = threading.Event()
+        signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+        start = time.time()
+        coordinator.start()
+        try:
+            done = coordinator.serve_until_done(stop_event)
+        finally:
+            coordinator.close()
+
+        counts = queue.counts()
+        write_failed_reports(queue, books, logger)
+        elapsed = time.time() - start
+        logger.info("=" * 50)
+        logger.info(f"분산 변환 {'완료' if done else '중단'} - 성공 {counts['done']}개, 실패 {counts['failed']}개, "
+                    f"남음 {counts['pending'] + counts['leased']}개, 소요 {int(elapsed) // 60}분 {int(elapsed) % 60}초")
+        for book in books:
+            if book.error:
+                logger.info(f"  {os.path.basename(book.excel_path)}: 읽기 실패 - {book.error}")
+        logger.info("=" * 50)
+        failed = counts['failed'] or any(book.error for book in books)
+        return 0 if done and not failed else 1
+    finally:
+        queue.close()
+
+
+def run_worker(args, settings, logger):
+    account = args.account
+    if not account:
+        registered = load_google_accounts(args.config_dir)
+        if len(registered) != 1:
+            logger.error("--account 로 사용할 구글 계정을 지정하세요.")
+            return 2
+        account = registered[0]
+
+    client = ClusterClient(args.coordinator, args.key, timeout=settings["http_timeout"])
+    worker = ClusterWorker(client, account, settings, args.config_dir, logger,
+                           worker_count=args.workers or settings["worker_count"],
+                           headless=not args.show_browser, name=args.name)
+    signal.signal(signal.SIGINT, lambda signum, frame: worker.stop())
+    try:
+        worker.run()
+    except Exception as e:
+        logger.error(f"작업자 오류: {str(e)}")
+        return 2
+    if not worker.started:
+        logger.error("크롬을 하나도 시작하지 못했습니다.")
+        return 2
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="엑셀 링크 PDF 분산 변환 (코디네이터 / 작업자)")
+    parser.add_argument("--config-dir", default=CONFIG_DIR, help="설정 폴더")
+    parser.add_argument("--key", default=os.environ.get(KEY_ENV),
+                        help=f"작업자 인증용 공유 키 (기본: 환경 변수 {KEY_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="작업 큐를 만들고 작업자에게 나눠 줌")
+    coordinator.add_argument("workbook", nargs="+", help="엑셀 파일, 폴더 또는 와일드카드")
+    coordinator.add_argument("-o", "--output", required=True,
+                             help="PDF 저장 폴더 (여러 통합문서면 통합문서별 하위 폴더)")
+    coordinator.add_argument("-s", "--sheets", nargs="+", help="처리할 시트 이름 (생략하면 전체 시트)")
+    coordinator.add_argument("-c", "--col", default="A", help="URL이 있는 열 문자 (기본: A)")
+    coordinator.add_argument("--host", default="0.0.0.0", help="수신 주소 (기본: 모든 네트워크)")
+    coordinator.add_argument("--port", type=int, default=8765, help="수신 포트 (기본: 8765)")
+    coordinator.add_argument("--lease", type=int, default=120,
+                             help="작업 임대 기간 (초, 이 시간 동안 소식이 없으면 다른 작업자에게 넘김)")
+
+    worker = commands.add_parser("worker", help="코디네이터에서 작업을 받아 변환")
+    worker.add_argument("coordinator", help="코디네이터 주소 (예: http://192.168.0.10:8765)")
+    worker.add_argument("-a", "--account", help="사용할 구글 계정 (등록된 계정이 하나뿐이면 생략 가능)")
+    worker.add_argument("-w", "--workers", type=int, help="이 컴퓨터에서 띄울 크롬 수 (기본: 설정값)")
+    worker.add_argument("--name", help="작업자 이름 (기본: 호스트 이름-프로세스 번호)")
+    worker.add_argument("--show-browser", action="store_true", help="헤드리스 대신 크롬 창을 띄움")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """명령줄 실행 (종료 코드: 0 전부 성공, 1 일부 실패 또는 중단, 2 실행 오류)"""
+    args = parse_args(argv)
+    settings = load_settings(args.config_dir)
+    logger = setup_logging(settings=settings)
+    if args.command == "coordinator":
+        return run_coordinator(args, settings, logger)
+    return run_worker(args, settings, logger)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2814 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel to PDF 변환 엔진 (무료 버전) v3.0
+화면(Tk) 없이 동작하는 변환 파이프라인과 명령줄 실행 진입점
+
+GUI(excel_to_pdf_free.py)와 명령줄 모두 이 엔진을 사용한다.
+서버나 예약 작업(cron)에서는 다음처럼 실행:
+
+    python excel_to_pdf_engine.py 통합문서.xlsx --output ./pdf --account user@gmail.com --sheets 1월 2월
+
+폴더나 여러 파일(와일드카드)을 주면 한 번에 배치로 처리하고, 결과는 통합문서마다
+출력 폴더 아래 하위 폴더에 저장:
+
+    python excel_to_pdf_engine.py ./월별자료 "보고서_*.xlsx" --output ./pdf
+"""
+
+import sys
+import os
+import time
+import threading
+import queue
+import shutil
+import tempfile
+import argparse
+import signal
+import glob
+import base64
+import logging
+import logging.handlers
+import atexit
+import copy
+from datetime import datetime
+import json
+import sqlite3
+import hashlib
+import re
+import random
+import heapq
+import csv
+import itertools
+from collections import namedtuple, deque
+from urllib.parse import urlparse, parse_qs, urlencode
+
+# openpyxl, selenium, psutil, requests, pypdf 는 무거워서 처음 쓰는 곳에서 import 한다
+# (GUI 창이 바로 뜨도록)
+
+# 설정/로그/프로필 기본 위치
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), "Documents", "Excel_to_PDF_Config")
+LOG_DIR = os.path.join(os.path.expanduser("~"), "Documents", "Excel_to_PDF_Logs")
+PROFILE_ROOT = os.path.join(os.path.expanduser("~"), "Documents", "Excel_to_PDF_Profiles")
+
+# 기본 설정 (config_dir/settings.json 으로 덮어쓸 수 있음)
+DEFAULT_SETTINGS = {
+    "worker_count": min(4, os.cpu_count() or 1),
+    # GUI 에서도 크롬 창 없이 실행 (명령줄은 항상 헤드리스, --show-browser 로 끔)
+    "headless": False,
+    # GUI 진행 상황 갱신 주기 (초당 횟수)
+    "ui_refresh_hz": 10,
+    # 페이지 준비 대기 (초 단위)
+    "page_ready_timeout": 30,
+    "network_idle_time": 0.5,
+    "network_idle_max_inflight": 2,
+    # 사이트별 준비 완료 판단용 CSS 선택자 (호스트명 뒤쪽 일치)
+    "ready_selectors": {
+        "docs.google.com": "#waffle-grid-container",
+    },
+    # printToPDF 결과를 스트림으로 받아 조각 단위로 파일에 기록
+    "pdf_stream": True,
+    "pdf_stream_chunk_size": 1024 * 1024,
+    # 작업 기록 (재시작 시 완료된 행 건너뛰기)
+    "resume_completed": True,
+    "journal_flush_interval": 1.0,
+    # 같은 URL은 한 번만 변환하고 나머지 행은 하드링크/복사로 채움
+    "dedupe_urls": True,
+    # 변환된 PDF 디스크 캐시 (URL + 인쇄 옵션 기준, 오래 안 쓴 것부터 삭제)
+    "pdf_cache": False,
+    "pdf_cache_max_mb": 2048,
+    "pdf_cache_max_age_hours": 24,
+    # 구글 스프레드시트는 브라우저 인쇄 대신 PDF 내보내기 주소로 바로 다운로드
+    "sheets_fast_path": True,
+    "sheets_export_base": "https://docs.google.com",
+    "http_timeout": 60,
+    # 여러 계정 동시 사용 시 링크 배정 규칙 (위에서부터 처음 일치하는 규칙 사용)
+    # 예: [{"account": "a@gmail.com", "sheets": ["1월"]},
+    #      {"account": "b@gmail.com", "url_pattern": "docs\\.google\\.com/spreadsheets/d/1abc"}]
+    # 규칙에 없는 링크는 먼저 비는 계정이 가져감
+    "account_routing": [],
+    # 렌더링 엔진: "selenium" (작업자마다 크롬 1개) 또는 "cdp" (계정별 크롬 1개 + 탭 여러 개)
+    "renderer": "selenium",
+    # cdp 렌더러가 실행할 크롬 경로 (비우면 자동 검색)
+    "chrome_path": "",
+    # 일시적 실패(시간 초과, HTTP 429/5xx, 네트워크, 크롬 비정상 종료) 재시도
+    "retry_max_attempts": 3,
+    "retry_base_delay": 5,
+    "retry_max_delay": 120,
+    # 작업별 단계 시간 기록 파일 형식 ("jsonl", "csv", 빈 값이면 기록 안 함)
+    "metrics_format": "jsonl",
+    # 크롬 재활용: 이 페이지 수를 처리하거나 프로세스 트리 메모리(MB)가 넘으면 새로 띄움 (0 이면 사용 안 함)
+    "recycle_after_pages": 200,
+    "recycle_max_rss_mb": 2048,
+    # 결과 저장 방식: "rows" 행별 PDF, "merged" 시트별 병합 PDF(행 책갈피), "both" 둘 다
+    "output_mode": "rows",
+    # 병합 PDF를 이 행 수마다 나눠 저장 (<시트>_001.pdf ..., 0 이면 시트 전체를 한 파일로)
+    "merge_part_rows": 500,
+    # 렌더링과 디스크 기록 사이 대기열 크기 (가득 차면 작업자가 기다림)
+    "writer_queue_size": 16,
+    # 호스트별 적응형 속도 제한 (초당 요청 수, 429/503 응답을 받으면 줄이고 정상이면 늘림)
+    "rate_limit": True,
+    "rate_limit_initial": 2.0,
+    "rate_limit_min": 0.1,
+    "rate_limit_max": 20.0,
+    "rate_limit_increase": 0.2,
+    "rate_limit_decrease": 0.5,
+    # 인쇄 결과와 무관한 요청 차단 (Network.setBlockedURLs 주소 패턴, * 는 임의 문자열)
+    "block_urls": [
+        "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+        "*googlesyndication.com/*", "*connect.facebook.net/*", "*hotjar.com/*",
+        "*clarity.ms/*", "*cdn.segment.com/*", "*intercom.io/*", "*intercomcdn.com/*",
+        "*zdassets.com/*", "*channel.io/*", "*wcs.naver.net/*",
+    ],
+    # 자원 종류별 차단: "font", "image", "media" (확장자 패턴으로 변환, 인쇄 모양이 바뀔 수 있음)
+    "block_resource_types": [],
+    # 확장 프로그램, 백그라운드 네트워크, 동기화 등 크롬 부가 기능 끄기
+    "lean_browser": False,
+    # GUI 에서 파일/시트/폴더를 고르는 동안 선택한 계정의 크롬을 미리 띄움
+    "prewarm_browser": False,
+    # 로그 파일 형식 ("text" 또는 "jsonl": 행/URL/상태/소요 시간 필드를 담은 JSON Lines)
+    "log_format": "text",
+    # 로그 파일이 이 크기(MB)를 넘으면 돌려 쓰고, 실행 로그는 최근 파일 수만큼만 남김
+    "log_max_mb": 10,
+    "log_backup_count": 5,
+    "log_keep_files": 30,
+}
+
+# Page.printToPDF 인쇄 옵션
+PRINT_OPTIONS = {
+    "printBackground": True,
+    "landscape": False,
+}
+
+# 자원 종류별 차단 주소 패턴 (setBlockedURLs 는 종류가 아닌 주소 패턴만 받으므로 확장자로 대응)
+RESOURCE_TYPE_PATTERNS = {
+    "font": ["*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*", "*.eot", "*.eot?*"],
+    "image": ["*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*",
+              "*.webp", "*.webp?*", "*.svg", "*.svg?*", "*.ico", "*.ico?*"],
+    "media": ["*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.mp3", "*.mp3?*", "*.m4a", "*.m4a?*",
+              "*.ogg", "*.ogg?*", "*.m3u8", "*.m3u8?*"],
+}
+
+# lean_browser: 인쇄에 필요 없는 크롬 부가 기능 끄기
+LEAN_BROWSER_ARGS = [
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-pings",
+]
+
+
+def blocked_url_patterns(settings):
+    """차단 주소 패턴과 자원 종류 설정을 Network.setBlockedURLs 용 패턴 목록으로"""
+    patterns = list(settings["block_urls"])
+    for resource_type in settings["block_resource_types"]:
+        if resource_type.lower() not in RESOURCE_TYPE_PATTERNS:
+            raise ValueError(f"알 수 없는 자원 종류: {resource_type} "
+                             f"(사용 가능: {', '.join(RESOURCE_TYPE_PATTERNS)})")
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type.lower()])
+    return list(dict.fromkeys(patterns))
+
+
+# 프로필 복제 시 제외할 항목 (크롬 잠금 파일 및 캐시)
+PROFILE_COPY_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "LOCK", "*.lock",
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache",
+    "CacheStorage", "ScriptCache", "Crashpad"
+)
+
+# 변환 작업 단위 (시트, 행 번호, URL, 통합문서 절대 경로)
+LinkJob = namedtuple("LinkJob", ["sheet", "row", "url", "workbook"], defaults=[None])
+
+# 렌더링 단위 (URL 하나와 그 결과를 받을 작업 목록, 접근 실패한 계정, 시도 횟수, 큐에 들어간 시각)
+RenderTask = namedtuple("RenderTask", ["url", "jobs", "tried", "attempts", "queued_at"],
+                        defaults=[frozenset(), 0, 0.0])
+
+
+def group_render_tasks(jobs, dedupe=True):
+    """작업 목록을 렌더링 단위로 묶음 (dedupe=True 이면 같은 URL끼리 묶음)"""
+    if not dedupe:
+        return [RenderTask(job.url, [job]) for job in jobs]
+    tasks = {}
+    for job in jobs:
+        tasks.setdefault(job.url, RenderTask(job.url, [])).jobs.append(job)
+    return list(tasks.values())
+
+
+def link_or_copy(src, dst):
+    """src 를 dst 로 하드링크 (불가능하면 복사), 기존 dst 는 원자적으로 교체"""
+    folder, name = os.path.split(dst)
+    temp_path = os.path.join(folder, f".{name}.{threading.get_ident()}.part")
+    try:
+        os.link(src, temp_path)
+    except OSError:
+        shutil.copyfile(src, temp_path)
+    os.replace(temp_path, dst)
+
+
+def move_into_place(src, dst):
+    """src 를 dst 로 옮김 (다른 드라이브면 복사 후 원본 삭제), 기존 dst 는 원자적으로 교체"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        link_or_copy(src, dst)
+        os.remove(src)
+
+
+def iter_sheet_links(sheet, col_index):
+    """시트의 URL 열에서 (행 번호, URL) 스트리밍 (2행부터 http 로 시작하는 값만)"""
+    rows = sheet.iter_rows(min_row=2, min_col=col_index, max_col=col_index, values_only=True)
+    for row, (value,) in enumerate(rows, start=2):
+        if value and str(value).startswith("http"):
+            yield row, str(value)
+
+
+def extract_link_jobs(excel_path, sheet_names, col):
+    """선택한 시트의 URL 열만 한 번에 읽어 작업 목록 생성
+    
+    읽기 전용 모드로 열어 행을 스트리밍하므로 큰 통합문서도
+    전체를 메모리에 올리지 않는다.
+    """
+    import openpyxl
+    from openpyxl.utils import column_index_from_string
+    
+    col_index = column_index_from_string(col)
+    workbook = os.path.abspath(excel_path)
+    jobs = []
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in sheet_names:
+            for row, url in iter_sheet_links(wb[sheet_name], col_index):
+                jobs.append(LinkJob(sheet_name, row, url, workbook))
+    finally:
+        wb.close()
+    return jobs
+
+
+def list_sheet_names(excel_path):
+    """시트 이름만 빠르게 읽기 (읽기 전용 모드는 시트 내용을 불러오지 않음)"""
+    import openpyxl
+    
+    wb = openpyxl.load_workbook(excel_path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def count_sheet_links(excel_path, sheet_names, col, on_count, cancelled=None):
+    """시트별 URL 개수를 세어 시트 하나가 끝날 때마다 on_count(sheet, count) 호출
+    
+    cancelled() 가 True 를 돌려주면 다음 시트로 넘어가기 전에 중단하고 False 반환.
+    """
+    import openpyxl
+    from openpyxl.utils import column_index_from_string
+    
+    col_index = column_index_from_string(col)
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in sheet_names:
+            if cancelled and cancelled():
+                return False
+            count = sum(1 for _ in iter_sheet_links(wb[sheet_name], col_index))
+            on_count(sheet_name, count)
+    finally:
+        wb.close()
+    return True
+
+
+class LinkCountCache:
+    """통합문서별 시트 목록과 열별 URL 개수 캐시
+    
+    파일 경로 + 수정 시각 + 크기가 같을 때만 사용하므로 파일이 바뀌면 자동으로 다시 센다.
+    config_dir/link_counts.json 에 저장.
+    """
+    
+    MAX_ENTRIES = 50
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+    
+    @staticmethod
+    def _key(excel_path):
+        stat = os.stat(excel_path)
+        return os.path.abspath(excel_path), f"{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def lookup(self, excel_path, col=None):
+        """(시트 목록, 시트별 개수) - 캐시에 없으면 None"""
+        path, stamp = self._key(excel_path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if not entry or entry["stamp"] != stamp:
+                return None, None
+            return entry["sheets"], entry["counts"].get(col) if col else None
+    
+    def store(self, excel_path, sheets, col=None, counts=None):
+        path, stamp = self._key(excel_path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if not entry or entry["stamp"] != stamp:
+                entry = {"stamp": stamp, "sheets": sheets, "counts": {}}
+            entry["sheets"] = sheets
+            if col and counts is not None:
+                entry["counts"][col] = counts
+            # 최근 사용한 파일이 뒤로 가도록 다시 넣고 오래된 항목 정리
+            self.entries.pop(path, None)
+            self.entries[path] = entry
+            while len(self.entries) > self.MAX_ENTRIES:
+                self.entries.pop(next(iter(self.entries)))
+            temp_path = f"{self.path}.part"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+
+class PhaseTimer:
+    """작업 하나의 단계별 소요 시간(초) 기록
+    
+    lap(phase) 를 부를 때마다 직전 표시 이후 흐른 시간을 그 단계에 더한다.
+    """
+    
+    def __init__(self, queue_wait=0.0):
+        self.phases = {"queue_wait": queue_wait}
+        self.source = None  # browser / sheets / cache
+        self.bytes = 0
+        self.throttled = 0  # 페이지 로딩 중 받은 429/503 응답 수
+        self.requests = 0  # 페이지 로딩 중 보낸 요청 수 (차단 포함)
+        self.blocked = 0  # 그중 차단 규칙에 걸린 요청 수
+        self.started_at = time.time()
+        self.started = self.mark = time.perf_counter()
+    
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.mark
+        self.mark = now
+    
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 q 백분위 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * q // 100) - 1))
+    return sorted_values[int(index)]
+
+
+class RunMetrics:
+    """작업별 단계 시간을 파일(JSONL/CSV)에 기록하고 백분위로 요약
+    
+    실행마다 시각을 붙인 새 파일에 기록하므로 이어서 다시 실행해도 이전 기록이 남는다.
+    """
+    
+    PHASES = ("queue_wait", "navigate", "ready", "print", "write", "export", "output", "total")
+    FIELDS = ("workbook", "sheet", "row", "url", "status", "kind", "attempts", "source", "bytes", "throttled",
+              "requests", "blocked") + PHASES
+    
+    def __init__(self, path=None, fmt="jsonl"):
+        self.path = path
+        self.fmt = fmt
+        self.values = {phase: [] for phase in self.PHASES}
+        self.lock = threading.Lock()
+        self.file = None
+        self.writer = None
+        if path:
+            self.file = open(path, 'w', encoding='utf-8', newline='')
+            if fmt == "csv":
+                self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+                self.writer.writeheader()
+    
+    @classmethod
+    def from_settings(cls, settings, save_folder):
+        fmt = settings["metrics_format"]
+        if fmt not in ("jsonl", "csv"):
+            return cls()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(os.path.join(save_folder, f"metrics_{timestamp}.{fmt}"), fmt)
+    
+    def record(self, job, timer, error=None, attempts=1):
+        row = {
+            "workbook": os.path.basename(job.workbook) if job.workbook else None,
+            "sheet": job.sheet,
+            "row": job.row,
+            "url": job.url,
+            "status": "done" if error is None else "failed",
+            "kind": None if error is None else error.kind,
+            "attempts": attempts,
+            "source": timer.source,
+            "bytes": timer.bytes,
+            "throttled": timer.throttled,
+            "requests": timer.requests,
+            "blocked": timer.blocked,
+        }
+        for phase in self.PHASES:
+            value = timer.phases.get(phase)
+            row[phase] = None if value is None else round(value, 4)
+        
+        with self.lock:
+            for phase in self.PHASES:
+                if row[phase] is not None:
+                    self.values[phase].append(row[phase])
+            if self.writer:
+                self.writer.writerow(row)
+            elif self.file:
+                self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+    
+    def summary(self):
+        """단계별 p50/p95/p99 (초)"""
+        result = {}
+        with self.lock:
+            for phase in self.PHASES:
+                values = sorted(self.values[phase])
+                if values:
+                    result[phase] = {f"p{q}": percentile(values, q) for q in (50, 95, 99)}
+        return result
+    
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+                self.writer = None
+
+
+def write_pdf(driver, pdf_path, stream=True, chunk_size=1024 * 1024, timer=None):
+    """현재 페이지를 PDF로 인쇄해 pdf_path 에 원자적으로 저장
+    
+    같은 폴더의 임시 파일에 먼저 쓰고 완료되면 이름을 바꾸므로
+    중간에 실패해도 깨진 PDF가 남지 않는다. stream=True 이면
+    transferMode=ReturnAsStream 으로 받아 IO.read 로 조각씩 기록해
+    PDF 전체를 메모리에 올리지 않는다. 기록한 바이트 수를 반환.
+    timer 가 있으면 printToPDF 호출을 print, 수신·디코딩·기록을 write 단계로 잰다.
+    """
+    folder, name = os.path.split(pdf_path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=folder)
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if stream:
+                result = driver.execute_cdp_cmd("Page.printToPDF",
+                                                dict(PRINT_OPTIONS, transferMode="ReturnAsStream"))
+                if timer:
+                    timer.lap("print")
+                handle = result['stream']
+                try:
+                    while True:
+                        chunk = driver.execute_cdp_cmd("IO.read", {"handle": handle, "size": chunk_size})
+                        data = chunk.get('data', "")
+                        if chunk.get('base64Encoded'):
+                            data = base64.b64decode(data)
+                        else:
+                            data = data.encode('latin-1')
+                        f.write(data)
+                        written += len(data)
+                        if chunk.get('eof'):
+                            break
+                finally:
+                    driver.execute_cdp_cmd("IO.close", {"handle": handle})
+            else:
+                result = driver.execute_cdp_cmd("Page.printToPDF", dict(PRINT_OPTIONS))
+                if timer:
+                    timer.lap("print")
+                data = base64.b64decode(result['data'])
+                f.write(data)
+                written = len(data)
+        os.replace(temp_path, pdf_path)
+        if timer:
+            timer.lap("write")
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return written
+
+
+class MergedSheet:
+    """병합 중인 시트 하나 (행 순서, 끝난 행, 지금 채우고 있는 부분 파일)
+    
+    행은 (행 번호, URL) 순서로 part_rows 개씩 부분 파일에 나눠 담는다.
+    부분 파일이 하나뿐이면 <시트>.pdf, 여럿이면 <시트>_001.pdf, <시트>_002.pdf ...
+    """
+    
+    def __init__(self, jobs, merged_path, part_rows, spool_dir):
+        self.order = sorted(jobs, key=lambda job: (job.row, job.url))
+        self.position = {job: i for i, job in enumerate(self.order)}
+        self.part_rows = part_rows if part_rows > 0 else max(1, len(self.order))
+        self.part_count = -(-len(self.order) // self.part_rows)
+        self.merged_path = merged_path
+        self.spool_dir = spool_dir
+        self.remaining = 0
+        self.ready = {}
+        self.next = 0
+        self.writer = None
+        self.rows = 0
+    
+    def part_path(self, index):
+        if self.part_count <= 1:
+            return self.merged_path
+        base, ext = os.path.splitext(self.merged_path)
+        return f"{base}_{index + 1:03d}{ext}"
+    
+    def path_of(self, job):
+        """행이 들어갈 병합 PDF 경로"""
+        return self.part_path(self.position[job] // self.part_rows)
+
+
+class SheetMerger:
+    """시트별 병합 PDF 생성 (행마다 책갈피)
+    
+    완료된 행의 PDF를 로컬 임시 폴더에 받아 두었다가, 앞 행이 모두 끝나는 대로
+    행 순서대로 병합 PDF에 붙이고 임시 파일을 지운다. 부분 파일(part_rows 행)이
+    다 차면 바로 저장하고 다음 부분 파일로 넘어가므로 메모리에는 부분 파일 하나
+    분량만 올라간다. 시트는 (통합문서, 시트 이름)으로 구분하고 저장 위치는
+    merged_path(workbook, sheet) 가 정한다. pypdf 필요.
+    """
+    
+    def __init__(self, spool_dir, merged_path, part_rows=0, logger=None):
+        try:
+            from pypdf import PdfWriter
+        except ImportError:
+            raise RuntimeError("병합 PDF를 만들려면 pypdf 패키지가 필요합니다 (pip install pypdf)") from None
+        self.pdf_writer = PdfWriter
+        self.spool_dir = spool_dir
+        self.merged_path = merged_path
+        self.part_rows = part_rows
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.sheets = {}
+        self.merged_paths = []
+        self.lock = threading.Lock()
+    
+    def plan(self, jobs):
+        """통합문서의 모든 행(이전 실행에서 완료된 행 포함) 등록, {작업: 병합 PDF 경로} 반환"""
+        by_sheet = {}
+        for job in jobs:
+            by_sheet.setdefault((job.workbook, job.sheet), []).append(job)
+        paths = {}
+        with self.lock:
+            for key, sheet_jobs in by_sheet.items():
+                sheet = MergedSheet(sheet_jobs, self.merged_path(*key), self.part_rows,
+                                    os.path.join(self.spool_dir, f"sheet_{len(self.sheets)}"))
+                self.sheets[key] = sheet
+                paths.update((job, sheet.path_of(job)) for job in sheet_jobs)
+        return paths
+    
+    def expect(self, jobs):
+        """변환할 행 등록 (시트별 완료 판단 기준)"""
+        with self.lock:
+            for job in jobs:
+                self.sheets[(job.workbook, job.sheet)].remaining += 1
+    
+    def add(self, job, pdf_path):
+        """완료된 행 추가 (pdf_path 는 임시 폴더로 하드링크/복사, 붙인 뒤 지움)"""
+        sheet = self.sheets[(job.workbook, job.sheet)]
+        position = sheet.position[job]
+        os.makedirs(sheet.spool_dir, exist_ok=True)
+        spool_path = os.path.join(sheet.spool_dir, f"row_{job.row}_{position}.pdf")
+        link_or_copy(pdf_path, spool_path)
+        with self.lock:
+            sheet.ready[position] = (spool_path, True)
+        self.job_done(job)
+    
+    def add_existing(self, job, pdf_path):
+        """이전 실행에서 완료된 행 (파일을 그대로 사용, 완료 수에는 포함하지 않음)"""
+        sheet = self.sheets.get((job.workbook, job.sheet))
+        if sheet is not None:
+            with self.lock:
+                sheet.ready[sheet.position[job]] = (pdf_path, False)
+    
+    def job_done(self, job):
+        """행 하나 끝남 (실패 포함), 앞 행이 모두 끝났으면 이어 붙이고 마지막 행이면 저장"""
+        key = (job.workbook, job.sheet)
+        sheet = self.sheets[key]
+        with self.lock:
+            sheet.ready.setdefault(sheet.position[job], None)
+            sheet.remaining -= 1
+        self.flush(key)
+    
+    def flush(self, key, final=False):
+        """끝난 행을 순서대로 붙임 (final 이면 아직 안 끝난 행은 빼고 마무리)"""
+        sheet = self.sheets[key]
+        while sheet.next < len(sheet.order):
+            with self.lock:
+                if sheet.next not in sheet.ready and not final:
+                    break
+                entry = sheet.ready.pop(sheet.next, None)
+            position = sheet.next
+            if position and position % sheet.part_rows == 0:
+                self.save_part(sheet, position // sheet.part_rows - 1)
+            if entry is not None:
+                self.append(sheet, position, *entry)
+            sheet.next += 1
+        if sheet.next < len(sheet.order):
+            return
+        self.save_part(sheet, (len(sheet.order) - 1) // sheet.part_rows)
+        with self.lock:
+            self.sheets.pop(key, None)
+        shutil.rmtree(sheet.spool_dir, ignore_errors=True)
+    
+    def append(self, sheet, position, path, temporary):
+        """행 PDF 하나를 지금 부분 파일에 붙임 (실패하면 그 행만 빠짐)"""
+        row = sheet.order[position].row
+        try:
+            if sheet.writer is None:
+                sheet.writer = self.pdf_writer()
+                sheet.rows = 0
+            sheet.writer.append(path, outline_item=f"{row}행")
+            sheet.rows += 1
+        except Exception as e:
+            self.logger.error(f"병합 PDF에 행 추가 실패 ({sheet.order[position].sheet} {row}행): {str(e)}")
+        finally:
+            if temporary:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def save_part(self, sheet, index):
+        """채운 부분 파일을 저장하고 메모리에서 내림"""
+        writer, rows = sheet.writer, sheet.rows
+        sheet.writer = None
+        sheet.rows = 0
+        if writer is None or not rows:
+            return
+        merged_path = sheet.part_path(index)
+        temp_path = f"{merged_path}.part"
+        try:
+            with open(temp_path, 'wb') as f:
+                writer.write(f)
+            os.replace(temp_path, merged_path)
+        except Exception as e:
+            self.logger.error(f"병합 PDF 생성 실패 ({os.path.basename(merged_path)}): {str(e)}")
+            return
+        self.merged_paths.append(merged_path)
+        self.logger.info(f"병합 PDF 저장: {merged_path} ({rows}개 행)")
+    
+    def close(self):
+        """중단 등으로 끝나지 않은 시트도 끝난 행까지 병합"""
+        with self.lock:
+            keys = [key for key, sheet in self.sheets.items() if sheet.remaining > 0]
+        for key in keys:
+            self.flush(key, final=True)
+
+
+class OutputWriter:
+    """렌더링과 디스크 기록을 분리하는 기록 단계
+    
+    작업자는 PDF를 로컬 임시 폴더(spool)에 받아 제한된 크기의 큐에 넘기고 바로
+    다음 링크로 넘어간다. 기록 스레드가 최종 위치(네트워크 공유 폴더 등)로 옮기고
+    중복 행을 채우거나 병합 PDF에 넣은 뒤 on_written 콜백으로 결과를 알린다.
+    큐가 가득 차면 작업자가 기다리므로 임시 파일이 무한정 쌓이지 않는다.
+    """
+    
+    def __init__(self, output_path, on_written, write_rows=True, merger=None,
+                 pdf_cache=None, maxsize=16, logger=None):
+        self.output_path = output_path
+        self.on_written = on_written
+        self.write_rows = write_rows
+        self.merger = merger
+        self.pdf_cache = pdf_cache
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.queue = queue.Queue(maxsize=max(1, maxsize))
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def submit(self, task, spool_path, timer):
+        """렌더링이 끝난 작업 전달 (큐가 가득 차면 대기)"""
+        self.queue.put(("written", task, spool_path, timer))
+    
+    def failed(self, task):
+        """최종 실패한 작업 알림 (병합 시트 완료 판단용)"""
+        if self.merger:
+            self.queue.put(("failed", task, None, None))
+    
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            kind, task, spool_path, timer = item
+            if kind == "failed":
+                for job in task.jobs:
+                    self.merger.job_done(job)
+                continue
+            try:
+                self.write(task, spool_path, store=timer.source != "cache")
+                error = None
+            except Exception as e:
+                error = ConversionError("io", f"결과 저장 실패: {str(e)}")
+                try:
+                    os.remove(spool_path)
+                except OSError:
+                    pass
+            timer.lap("output")
+            self.on_written(task, timer, error)
+    
+    def write(self, task, spool_path, store=True):
+        if self.merger:
+            added = 0
+            try:
+                for job in task.jobs:
+                    self.merger.add(job, spool_path)
+                    added += 1
+            except Exception:
+                # 병합에 넣지 못한 행도 끝난 것으로 쳐야 그 시트의 병합이 기다리다 멈추지 않음
+                for job in task.jobs[added:]:
+                    self.merger.job_done(job)
+                raise
+        if self.write_rows:
+            # 첫 행은 옮기고 같은 URL의 나머지 행은 하드링크 또는 복사
+            first_path = self.output_path(task.jobs[0])
+            move_into_place(spool_path, first_path)
+            for job in task.jobs[1:]:
+                link_or_copy(first_path, self.output_path(job))
+            if self.pdf_cache and store:
+                self.pdf_cache.store(task.url, first_path)
+        else:
+            if self.pdf_cache and store:
+                self.pdf_cache.store(task.url, spool_path)
+            os.remove(spool_path)
+    
+    def close(self):
+        """남은 작업을 모두 기록하고 종료"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.merger:
+            self.merger.close()
+
+
+class JobJournal:
+    """작업별 진행 기록 (SQLite)
+    
+    (통합문서, 시트, 행, URL) 단위로 상태·소요 시간·출력 경로를 남겨
+    중단 후 다시 시작할 때 완료된 행을 건너뛸 수 있게 한다.
+    결과 기록은 메모리에 모았다가 별도 스레드가 주기적으로 한 번에
+    커밋하므로 변환 작업자는 디스크 쓰기를 기다리지 않는다.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            workbook TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            row INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            started_at REAL,
+            finished_at REAL,
+            duration REAL,
+            output_path TEXT,
+            error TEXT,
+            PRIMARY KEY (workbook, sheet, row, url)
+        )
+    """
+    
+    def __init__(self, db_path, flush_interval=1.0):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        
+        with self._connect() as conn:
+            conn.execute(self.SCHEMA)
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def completed_outputs(self, workbook):
+        """통합문서에서 완료된 작업의 {(시트, 행, URL): 출력 경로}"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT sheet, row, url, output_path FROM jobs WHERE workbook = ? AND status = 'done'",
+                (os.path.abspath(workbook),)).fetchall()
+        return {(sheet, row, url): output_path for sheet, row, url, output_path in rows}
+    
+    def register(self, jobs):
+        """이번 실행의 작업을 pending 으로 등록 (기존 기록은 유지)"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (workbook, sheet, row, url) VALUES (?, ?, ?, ?)",
+                [(job.workbook, job.sheet, job.row, job.url) for job in jobs])
+    
+    def record(self, job, status, started_at, finished_at, output_path=None, error=None):
+        """결과 기록 (실제 저장은 다음 flush 때)"""
+        with self.lock:
+            self.pending.append((job.workbook, job.sheet, job.row, job.url, status,
+                                 started_at, finished_at, finished_at - started_at,
+                                 output_path, error))
+    
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+    
+    def close(self):
+        """남은 기록을 모두 저장하고 종료"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+    
+    def _flush_loop(self):
+        conn = self._connect()
+        try:
+            while not self.stop_event.wait(self.flush_interval):
+                self._flush(conn)
+            self._flush(conn)
+        finally:
+            conn.close()
+    
+    def _flush(self, conn):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        with conn:
+            conn.executemany("""
+                INSERT INTO jobs (workbook, sheet, row, url, status, attempts,
+                                  started_at, finished_at, duration, output_path, error)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (workbook, sheet, row, url) DO UPDATE SET
+                    status = excluded.status,
+                    attempts = attempts + 1,
+                    started_at = excluded.started_at,
+                    finished_at = excluded.finished_at,
+                    duration = excluded.duration,
+                    output_path = excluded.output_path,
+                    error = excluded.error
+            """, batch)
+
+
+class PdfCache:
+    """변환된 PDF 디스크 캐시
+    
+    URL 과 인쇄 옵션의 해시를 키로 PDF 를 보관한다. 사용할 때마다
+    수정 시각을 갱신하고, 용량을 넘으면 오래 안 쓴 파일부터 지운다.
+    max_age 보다 오래된 항목은 문서가 바뀌었을 수 있으므로 쓰지 않는다.
+    """
+    
+    def __init__(self, cache_dir, max_bytes, max_age, logger=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.logger = logger or logging.getLogger(__name__)
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @classmethod
+    def from_settings(cls, settings, config_dir, logger=None):
+        return cls(os.path.join(config_dir, "pdf_cache"),
+                   settings["pdf_cache_max_mb"] * 1024 * 1024,
+                   settings["pdf_cache_max_age_hours"] * 3600,
+                   logger=logger)
+    
+    def path_for(self, url):
+        key = json.dumps({"url": url, "options": PRINT_OPTIONS}, sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".pdf")
+    
+    def fetch(self, url, dst):
+        """캐시에 있으면 dst 에 채우고 True"""
+        path = self.path_for(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return False
+            link_or_copy(path, dst)
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+    
+    def store(self, url, src):
+        """변환 결과를 캐시에 추가하고 용량 초과분 정리"""
+        try:
+            link_or_copy(src, self.path_for(url))
+        except OSError as e:
+            self.logger.warning(f"PDF 캐시 저장 실패: {str(e)}")
+            return
+        with self.lock:
+            self.evict()
+    
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+SHEETS_URL_PATTERN = re.compile(r"^https?://docs\.google\.com/spreadsheets/d/([A-Za-z0-9_-]+)")
+
+
+def sheets_export_url(url, base="https://docs.google.com"):
+    """구글 스프레드시트 링크를 PDF 내보내기 주소로 변환 (해당 없으면 None)
+    
+    링크의 gid 와 range 는 쿼리·# 어느 쪽에 있어도 그대로 유지한다.
+    """
+    match = SHEETS_URL_PATTERN.match(url)
+    if not match:
+        return None
+    parsed = urlparse(url)
+    params = parse_qs(parsed.query)
+    params.update(parse_qs(parsed.fragment))
+    export_params = {"format": "pdf", "portrait": "true"}
+    for key in ("gid", "range"):
+        if params.get(key):
+            export_params[key] = params[key][0]
+    return f"{base.rstrip('/')}/spreadsheets/d/{match.group(1)}/export?{urlencode(export_params)}"
+
+
+class SheetsExporter:
+    """구글 스프레드시트 PDF 내보내기 빠른 경로
+    
+    계정 프로필의 쿠키를 렌더러(브라우저)에서 가져와 keep-alive 세션으로
+    내보내기 주소를 직접 다운로드한다. 응답이 PDF 가 아니면 (권한 없음,
+    로그인 페이지 등) False 를 반환하므로 호출 측에서 브라우저 인쇄로 넘어간다.
+    HTTP 429/5xx 는 같은 서버에 브라우저로 다시 요청하지 않도록 ConversionError
+    (throttled / server_error) 로 알려 재시도 대기와 속도 제한을 따르게 한다.
+    """
+    
+    def __init__(self, renderer, base, timeout=60, logger=None):
+        self.renderer = renderer
+        self.base = base
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        try:
+            self.session.headers["User-Agent"] = renderer.user_agent()
+        except Exception as e:
+            # 세션 기본 User-Agent 로 계속 (쿠키 동기화와 같이 실패해도 작업자는 계속)
+            self.logger.warning(f"User-Agent 조회 실패, 기본값 사용: {str(e)}")
+        self.sync_cookies()
+    
+    @classmethod
+    def from_settings(cls, renderer, settings, logger=None):
+        return cls(renderer, settings["sheets_export_base"], settings["http_timeout"], logger)
+    
+    def sync_cookies(self):
+        """브라우저 프로필의 쿠키를 세션에 복사 (실패하면 기존 쿠키를 그대로 사용)"""
+        try:
+            cookies = self.renderer.get_cookies()
+        except Exception as e:
+            self.logger.warning(f"쿠키 동기화 실패: {str(e)}")
+            return
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie["domain"], path=cookie.get("path", "/"),
+                                     secure=cookie.get("secure", False))
+    
+    def export(self, url, pdf_path):
+        """내보내기로 pdf_path 저장, 성공하면 True (429/5xx 는 ConversionError)"""
+        export_url = sheets_export_url(url, self.base)
+        if not export_url:
+            return False
+        
+        folder, name = os.path.split(pdf_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with self.session.get(export_url, stream=True, timeout=self.timeout) as response:
+                    status = response.status_code
+                    if status == 429 or status >= 500:
+                        check_http_status(status)
+                    if status != 200:
+                        raise ValueError(f"HTTP {status}")
+                    head = b""
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        if not head:
+                            head = chunk[:5]
+                            if head != b"%PDF-":
+                                raise ValueError("PDF 가 아닌 응답 (권한 없음 또는 로그인 필요)")
+                        f.write(chunk)
+                    if not head:
+                        raise ValueError("빈 응답")
+            os.replace(temp_path, pdf_path)
+            return True
+        except Exception as e:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            if isinstance(e, ConversionError):
+                raise
+            self.logger.warning(f"내보내기 실패, 브라우저로 변환: {url} - {str(e)}")
+            return False
+
+
+class ConversionError(Exception):
+    """분류된 변환 실패
+    
+    kind 종류:
+    - timeout: 페이지 준비 시간 초과
+    - throttled: HTTP 429
+    - server_error: HTTP 5xx
+    - network: net::ERR_* 연결 오류
+    - driver_crash: 크롬/드라이버가 응답하지 않음 (재시작 필요)
+    - recycled: 크롬 재활용으로 받지 않았거나 취소됨 (시도 횟수에 넣지 않고 다시 처리)
+    - access_denied: 로그인/권한 없음
+    - http_error: 그 밖의 HTTP 4xx
+    - io: PDF 파일 기록 실패
+    - no_worker: 처리할 작업자(크롬)를 띄우지 못함
+    - other: 분류되지 않은 오류
+    """
+    
+    TRANSIENT = {"timeout", "throttled", "server_error", "network", "driver_crash"}
+    
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+    
+    @property
+    def transient(self):
+        """다시 시도하면 성공할 수 있는 실패인지"""
+        return self.kind in self.TRANSIENT
+
+
+class AccessDeniedError(ConversionError):
+    """현재 계정으로는 문서를 열 수 없음 (로그인/권한 요청 페이지)"""
+    
+    def __init__(self, message):
+        super().__init__("access_denied", message)
+
+
+# 크롬/드라이버가 죽었을 때 나오는 오류 문구
+DRIVER_CRASH_MARKERS = (
+    "invalid session id", "chrome not reachable", "disconnected: not connected to devtools", "session deleted",
+    "no such window", "target window already closed", "target closed", "tab crashed",
+    "devtools 연결이 끊어졌습니다",
+)
+
+
+def classify_error(exc):
+    """예외를 ConversionError 로 분류"""
+    if isinstance(exc, ConversionError):
+        return exc
+    name = type(exc).__name__
+    lowered = str(exc).lower()
+    if isinstance(exc, TimeoutError) or name in ("TimeoutException", "TimeoutError"):
+        kind = "timeout"
+    elif "net::err_" in lowered:
+        # net::ERR_INTERNET_DISCONNECTED 등은 페이지 연결 오류 (크롬은 살아 있음)
+        kind = "network"
+    elif (isinstance(exc, ConnectionError) or name.startswith("ConnectionClosed")
+          or name in ("MaxRetryError", "InvalidSessionIdException", "NoSuchWindowException")
+          or any(marker in lowered for marker in DRIVER_CRASH_MARKERS)):
+        kind = "driver_crash"
+    else:
+        kind = "other"
+    return ConversionError(kind, f"{name}: {str(exc).strip().splitlines()[0] if str(exc).strip() else name}")
+
+
+def check_http_status(status):
+    """페이지 응답 상태 코드가 오류면 ConversionError"""
+    if status is None or status < 400:
+        return
+    if status == 429:
+        raise ConversionError("throttled", "HTTP 429")
+    if status >= 500:
+        raise ConversionError("server_error", f"HTTP {status}")
+    if status in (401, 403):
+        raise AccessDeniedError(f"HTTP {status}")
+    raise ConversionError("http_error", f"HTTP {status}")
+
+
+# 서버가 요청을 줄이라고 보내는 응답 코드
+THROTTLE_STATUSES = (429, 503)
+
+
+def retry_delay(attempts, base, cap):
+    """지수 백오프 + 지터 (attempts 번째 재시도까지 기다릴 초)"""
+    return min(cap, base * (2 ** (attempts - 1)) * random.uniform(0.5, 1.5))
+
+
+# 권한 없음 판단 기준
+ACCESS_DENIED_HOSTS = ("accounts.google.com",)
+ACCESS_DENIED_MARKERS = ("You need access", "Request access", "액세스 권한 필요", "액세스 권한 요청")
+
+
+def check_access(driver):
+    """로그인/권한 요청 페이지로 이동했으면 AccessDeniedError"""
+    host = (urlparse(driver.current_url).hostname or "").lower()
+    if host in ACCESS_DENIED_HOSTS:
+        raise AccessDeniedError(f"로그인 페이지로 이동됨: {driver.current_url}")
+    text = driver.execute_script(
+        "return document.body ? document.body.innerText.slice(0, 2000) : ''") or ""
+    for marker in ACCESS_DENIED_MARKERS:
+        if marker in text:
+            raise AccessDeniedError(f"접근 권한 없음 ({marker})")
+
+
+def route_account(task, rules, accounts):
+    """배정 규칙에 따라 작업을 맡을 계정 (규칙이 없으면 None = 아무 계정)"""
+    first = task.jobs[0]
+    for rule in rules:
+        account = rule.get("account")
+        if account not in accounts or account in task.tried:
+            continue
+        sheets = rule.get("sheets")
+        pattern = rule.get("url_pattern")
+        if not sheets and not pattern:
+            continue
+        if sheets and first.sheet not in sheets:
+            continue
+        if pattern and not re.search(pattern, task.url):
+            continue
+        return account
+    return None
+
+
+class TaskScheduler:
+    """계정별 작업 분배
+    
+    배정 규칙에 걸린 작업은 해당 계정 큐에, 나머지는 공용 큐에 넣는다.
+    작업자는 자기 계정 큐를 먼저 보고 없으면 공용 큐에서 가져간다.
+    권한 없음으로 실패한 작업은 아직 시도하지 않은 다른 계정으로 다시 보낸다.
+    재시도 작업은 대기 시간이 지날 때까지 별도 힙에 두므로 다른 작업을 막지 않는다.
+    모든 작업이 끝나야(outstanding == 0) 작업자에게 종료(None)를 돌려준다.
+    """
+    
+    def __init__(self, accounts, rules=None):
+        self.accounts = list(accounts)
+        self.alive = set(self.accounts)
+        self.rules = rules or []
+        self.queues = {account: deque() for account in self.accounts}
+        self.shared = deque()
+        self.deferred = []
+        self.deferred_seq = 0
+        self.cond = threading.Condition()
+        self.outstanding = 0
+        self.closed = False
+        self.cancelled = False
+    
+    def add(self, task):
+        """새 작업 등록"""
+        with self.cond:
+            self.outstanding += 1
+            self._put(task, route_account(task, self.rules, self.alive))
+    
+    def _put(self, task, account):
+        task = task._replace(queued_at=time.monotonic())
+        if account:
+            self.queues[account].append(task)
+        else:
+            self.shared.append(task)
+        self.cond.notify_all()
+    
+    def get(self, account):
+        """account 작업자가 처리할 다음 작업 (끝났으면 None)"""
+        with self.cond:
+            while True:
+                if self.cancelled:
+                    return None
+                self._release_due()
+                own = self.queues[account]
+                if own:
+                    return own.popleft()
+                for index, task in enumerate(self.shared):
+                    if account not in task.tried:
+                        del self.shared[index]
+                        return task
+                if self.closed and self.outstanding == 0:
+                    return None
+                timeout = 0.5
+                if self.deferred:
+                    timeout = min(timeout, max(0.01, self.deferred[0][0] - time.monotonic()))
+                self.cond.wait(timeout)
+    
+    def _release_due(self):
+        """대기 시간이 지난 재시도 작업을 큐로 되돌림"""
+        now = time.monotonic()
+        while self.deferred and self.deferred[0][0] <= now:
+            _, _, task = heapq.heappop(self.deferred)
+            self._put(task, route_account(task, self.rules, self.alive))
+    
+    def defer(self, task, delay):
+        """delay 초 뒤에 다시 처리할 작업 등록"""
+        with self.cond:
+            self.deferred_seq += 1
+            heapq.heappush(self.deferred, (time.monotonic() + delay, self.deferred_seq, task))
+            self.cond.notify_all()
+    
+    def reroute(self, task, account):
+        """권한 없음 작업을 다른 계정으로 보냄, 보낼 계정이 없으면 None"""
+        with self.cond:
+            task = task._replace(tried=task.tried | {account})
+            candidates = [a for a in self.accounts if a in self.alive and a not in task.tried]
+            if not candidates:
+                return None
+            target = route_account(task, self.rules, candidates) or candidates[0]
+            self._put(task, target)
+            return target
+    
+    def done(self):
+        """작업 하나 처리 완료 (성공/실패 무관)"""
+        with self.cond:
+            self.outstanding -= 1
+            self.cond.notify_all()
+    
+    def retire(self, account):
+        """작업자를 띄우지 못한 계정 제외, 다른 계정이 맡을 수 없는 작업 목록 반환"""
+        with self.cond:
+            self.alive.discard(account)
+            self.shared.extend(self.queues[account])
+            self.queues[account].clear()
+            orphans = [task for task in self.shared if not (self.alive - task.tried)]
+            for task in orphans:
+                self.shared.remove(task)
+                self.outstanding -= 1
+            # 재시도/속도 제한으로 미뤄 둔 작업도 맡을 계정이 없으면 돌려줌
+            waiting = [entry for entry in self.deferred if self.alive - entry[2].tried]
+            for entry in self.deferred:
+                if not (self.alive - entry[2].tried):
+                    orphans.append(entry[2])
+                    self.outstanding -= 1
+            if len(waiting) != len(self.deferred):
+                self.deferred = waiting
+                heapq.heapify(self.deferred)
+            self.cond.notify_all()
+            return orphans
+    
+    def close(self):
+        """더 이상 새 작업 없음"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+    
+    def cancel(self):
+        """중지: 대기 중인 작업자를 바로 종료"""
+        with self.cond:
+            self.cancelled = True
+            self.cond.notify_all()
+    
+    def drain(self):
+        """처리되지 않고 남은 작업"""
+        with self.cond:
+            remaining = list(self.shared)
+            remaining.extend(task for _, _, task in self.deferred)
+            self.deferred.clear()
+            for account_queue in self.queues.values():
+                remaining.extend(account_queue)
+                account_queue.clear()
+            self.shared.clear()
+            return remaining
+
+
+class PageReadiness:
+    """페이지 준비 완료 판단 (고정 대기 대신 이벤트 기반으로 대기)
+    
+    다음 조건을 모두 만족하면 준비 완료로 본다.
+    - document.readyState == 'complete'
+    - 사이트별 CSS 선택자가 지정된 경우 해당 요소가 존재
+    - CDP Network 이벤트 기준 진행 중인 요청이 max_inflight 이하로
+      idle_time 동안 유지 (롱폴링 연결이 있는 페이지를 위해 일부 허용)
+    
+    readyState 와 선택자는 필수 조건이고, 네트워크 유휴는 timeout 까지만
+    기다린 뒤 경고만 남기고 진행한다. 본문 응답이 HTTP 오류(4xx/5xx)면
+    더 기다리지 않고 바로 반환한다. 반환값은 본문 응답 상태 코드.
+    """
+    
+    POLL_INTERVAL = 0.1
+    
+    def __init__(self, timeout=30, idle_time=0.5, max_inflight=2, selectors=None, logger=None):
+        self.timeout = timeout
+        self.idle_time = idle_time
+        self.max_inflight = max_inflight
+        self.selectors = selectors or {}
+        self.logger = logger or logging.getLogger(__name__)
+        self.throttled = 0  # 마지막 페이지 로딩 중 받은 429/503 응답 수
+        self.requests = 0  # 마지막 페이지 로딩 중 보낸 요청 수
+        self.blocked = 0  # 그중 차단된 요청 수
+    
+    @classmethod
+    def from_settings(cls, settings, logger=None):
+        return cls(timeout=settings["page_ready_timeout"],
+                   idle_time=settings["network_idle_time"],
+                   max_inflight=settings["network_idle_max_inflight"],
+                   selectors=settings["ready_selectors"],
+                   logger=logger)
+    
+    def selector_for(self, url):
+        """URL 호스트에 해당하는 준비 완료 선택자"""
+        host = (urlparse(url).hostname or "").lower()
+        for site, selector in self.selectors.items():
+            site = site.lower()
+            if host == site or host.endswith("." + site):
+                return selector
+        return None
+    
+    def reset(self, driver):
+        """이전 페이지의 네트워크 이벤트 버리기 (driver.get 직전에 호출)"""
+        self.throttled = 0
+        self.requests = 0
+        self.blocked = 0
+        try:
+            driver.get_log("performance")
+        except Exception:
+            pass
+    
+    def wait(self, driver, url):
+        """페이지가 준비될 때까지 대기, 필수 조건을 못 채우면 TimeoutError"""
+        deadline = time.monotonic() + self.timeout
+        selector = self.selector_for(url)
+        inflight = set()
+        status = {}
+        idle_since = None
+        document_ready = False
+        selector_ready = selector is None
+        
+        while True:
+            now = time.monotonic()
+            self._track_network(driver, inflight, status)
+            
+            if not document_ready:
+                document_ready = driver.execute_script("return document.readyState") == "complete"
+            if document_ready and status.get("document", 0) >= 400:
+                return status["document"]
+            if document_ready and not selector_ready:
+                selector_ready = driver.execute_script(
+                    "return document.querySelector(arguments[0]) !== null", selector)
+            
+            if len(inflight) <= self.max_inflight:
+                if idle_since is None:
+                    idle_since = now
+            else:
+                idle_since = None
+            network_idle = idle_since is not None and now - idle_since >= self.idle_time
+            
+            if document_ready and selector_ready and network_idle:
+                return status.get("document")
+            
+            if now >= deadline:
+                if document_ready and selector_ready:
+                    self.logger.warning(f"네트워크 유휴 대기 시간 초과, 그대로 인쇄: {url} (진행 중 요청 {len(inflight)}개)")
+                    return status.get("document")
+                missing = "readyState" if not document_ready else f"선택자 {selector}"
+                raise TimeoutError(f"페이지 준비 시간 초과 ({self.timeout}초, {missing})")
+            
+            time.sleep(self.POLL_INTERVAL)
+    
+    def _track_network(self, driver, inflight, status):
+        """성능 로그의 CDP Network 이벤트로 진행 중인 요청과 본문 응답 코드 추적"""
+        for entry in driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method", "")
+            params = message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                inflight.add(params.get("requestId"))
+                self.requests += 1
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                inflight.discard(params.get("requestId"))
+                if params.get("blockedReason") == "inspector":
+                    self.blocked += 1
+            elif method == "Network.responseReceived":
+                code = params.get("response", {}).get("status")
+                if code in THROTTLE_STATUSES:
+                    self.throttled += 1
+                if params.get("type") == "Document":
+                    status.setdefault("document", code)
+
+
+class HostRateLimiter:
+    """호스트별 적응형 속도 제한
+    
+    호스트마다 토큰 버킷(초당 요청 수)과 동시 처리 수 한도를 두고 AIMD 로 조절한다.
+    정상 응답이면 속도와 동시 처리 수를 조금씩 올리고(가산 증가), 429/503 을 받으면
+    decrease 배로 줄인다(승산 감소). 그래서 호스트마다 견딜 수 있는 최고 속도 근처에서 동작한다.
+    """
+    
+    BUSY_RETRY = 0.2  # 동시 처리 수 한도에 걸렸을 때 다시 볼 간격 (초)
+    
+    def __init__(self, initial_rate, min_rate, max_rate, max_concurrency,
+                 increase=0.2, decrease=0.5, logger=None):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.increase = increase
+        self.decrease = decrease
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.hosts = {}
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, settings, logger=None):
+        if not settings["rate_limit"]:
+            return None
+        return cls(settings["rate_limit_initial"], settings["rate_limit_min"],
+                   settings["rate_limit_max"], settings["worker_count"],
+                   increase=settings["rate_limit_increase"],
+                   decrease=settings["rate_limit_decrease"],
+                   logger=logger)
+    
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                "rate": self.initial_rate,
+                "tokens": 1.0,
+                "updated": time.monotonic(),
+                "limit": float(self.max_concurrency),
+                "inflight": 0,
+            }
+        return state
+    
+    def try_acquire(self, host):
+        """바로 요청할 수 있으면 0, 아니면 기다려야 할 초"""
+        with self.lock:
+            state = self._state(host)
+            now = time.monotonic()
+            # 버킷 크기는 1초 분량 (최소 1)
+            state["tokens"] = min(max(1.0, state["rate"]),
+                                  state["tokens"] + (now - state["updated"]) * state["rate"])
+            state["updated"] = now
+            if state["inflight"] >= int(state["limit"]):
+                return self.BUSY_RETRY
+            if state["tokens"] < 1.0:
+                return (1.0 - state["tokens"]) / state["rate"]
+            state["tokens"] -= 1.0
+            state["inflight"] += 1
+            return 0
+    
+    def release(self, host, throttled=False, healthy=True):
+        """요청 결과 반영 (throttled: 429/503 받음, healthy: 정상 완료)"""
+        with self.lock:
+            state = self._state(host)
+            state["inflight"] = max(0, state["inflight"] - 1)
+            if throttled:
+                state["rate"] = max(self.min_rate, state["rate"] * self.decrease)
+                state["limit"] = max(1.0, state["limit"] * self.decrease)
+                state["tokens"] = min(state["tokens"], 0.0)
+                self.logger.warning(f"속도 제한 감지 ({host}): 초당 {state['rate']:.2f}회, "
+                                    f"동시 {int(state['limit'])}개로 감소")
+            elif healthy:
+                state["rate"] = min(self.max_rate, state["rate"] + self.increase)
+                state["limit"] = min(float(self.max_concurrency), state["limit"] + 1.0 / state["limit"])
+    
+    def snapshot(self):
+        """호스트별 현재 (초당 요청 수, 동시 처리 수)"""
+        with self.lock:
+            return {host: (round(state["rate"], 2), int(state["limit"]))
+                    for host, state in self.hosts.items()}
+
+
+class ProcessTree:
+    """우리가 띄운 프로세스(크롬드라이버 또는 크롬)와 그 자손만 다룸
+    
+    같은 컴퓨터의 다른 크롬(사용자 브라우저, 다른 변환 작업)은 건드리지 않는다.
+    """
+    
+    def __init__(self, pid):
+        import psutil
+        
+        self.error = psutil.Error
+        try:
+            self.root = psutil.Process(pid) if pid else None
+        except psutil.Error:
+            self.root = None
+    
+    @classmethod
+    def of_driver(cls, driver):
+        """Selenium 드라이버가 띄운 크롬드라이버 프로세스 트리"""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        return cls(process.pid if process else None)
+    
+    def processes(self):
+        """루트와 모든 자손 (이미 종료되었으면 빈 목록)"""
+        if self.root is None:
+            return []
+        try:
+            return [self.root] + self.root.children(recursive=True)
+        except self.error:
+            return []
+    
+    def rss(self):
+        """프로세스 트리 전체 RSS (바이트)"""
+        total = 0
+        for proc in self.processes():
+            try:
+                total += proc.memory_info().rss
+            except self.error:
+                pass
+        return total
+    
+    @staticmethod
+    def kill(procs, timeout=3):
+        """남아 있는 프로세스 강제 종료"""
+        import psutil
+        
+        for proc in procs:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        psutil.wait_procs(procs, timeout=timeout)
+
+
+def quit_driver(driver):
+    """드라이버 종료 후 남은 자손 프로세스(크롬)까지 정리
+    
+    quit 하면 크롬이 크롬드라이버와의 부모 관계를 잃을 수 있어 먼저 목록을 잡아 둔다.
+    """
+    procs = ProcessTree.of_driver(driver).processes()
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    ProcessTree.kill(procs)
+
+
+class RecyclePolicy:
+    """처리한 페이지 수와 프로세스 트리 메모리로 크롬 재활용 시점 판단
+    
+    오래 실행하면 구글 시트 페이지가 메모리를 계속 늘리므로 주기적으로 새로 띄운다.
+    """
+    
+    def __init__(self, max_pages=0, max_rss_mb=0):
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+    
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings["recycle_after_pages"], settings["recycle_max_rss_mb"])
+    
+    def reason(self, pages, tree):
+        """재활용해야 하면 이유, 아니면 None"""
+        return self.pages_reason(pages) or self.memory_reason(tree)
+    
+    def pages_reason(self, pages):
+        """처리한 페이지 수 기준"""
+        if self.max_pages and pages >= self.max_pages:
+            return f"{pages}페이지 처리"
+        return None
+    
+    def memory_reason(self, tree):
+        """프로세스 트리 전체 메모리 기준"""
+        if self.max_rss_mb:
+            rss_mb = tree.rss() / (1024 * 1024)
+            if rss_mb >= self.max_rss_mb:
+                return f"메모리 {rss_mb:.0f}MB"
+        return None
+
+
+class SeleniumRenderer:
+    """Selenium 크롬 드라이버 하나로 URL 을 PDF 로 변환하는 렌더러
+    
+    렌더러 공통 인터페이스 (excel_to_pdf_cdp.CdpRenderer 와 교체 가능):
+    - convert_to_pdf(url, folder, filename, timer=None): 실패하면 분류된 ConversionError
+    - get_cookies() / user_agent(): 구글 시트 내보내기용 로그인 정보
+    - recycle_reason(): 크롬을 새로 띄워야 하면 이유 (cdp 는 페이지 수를 탭 단위로 자체 처리하고 메모리만 알림)
+    - close()
+    """
+    
+    def __init__(self, driver, readiness, settings, logger=None):
+        self.driver = driver
+        self.readiness = readiness
+        self.settings = settings
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.tree = ProcessTree.of_driver(driver)
+        self.policy = RecyclePolicy.from_settings(settings)
+        self.pages = 0
+    
+    def convert_to_pdf(self, url, folder, filename, timer=None):
+        """URL을 PDF로 변환 (timer 에 단계별 시간 기록)"""
+        driver = self.driver
+        timer = timer or PhaseTimer()
+        self.pages += 1
+        try:
+            self.readiness.reset(driver)
+            driver.get(url)
+            timer.lap("navigate")
+            try:
+                status = self.readiness.wait(driver, url)  # 페이지 준비 완료 대기
+            finally:
+                timer.throttled = self.readiness.throttled
+                timer.requests = self.readiness.requests
+                timer.blocked = self.readiness.blocked
+            check_http_status(status)
+            check_access(driver)
+            timer.lap("ready")
+            
+            # PDF로 인쇄
+            pdf_path = os.path.join(folder, f"{filename}.pdf")
+            write_pdf(driver, pdf_path,
+                      stream=self.settings["pdf_stream"],
+                      chunk_size=self.settings["pdf_stream_chunk_size"],
+                      timer=timer)
+        except ConversionError:
+            raise
+        except Exception as e:
+            # 준비 대기 시간 초과 등은 로그인/권한 페이지 때문일 수 있음
+            try:
+                check_access(driver)
+            except AccessDeniedError:
+                raise
+            except Exception:
+                pass
+            raise classify_error(e) from e
+    
+    def get_cookies(self):
+        return self.driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    
+    def user_agent(self):
+        return self.driver.execute_script("return navigator.userAgent")
+    
+    def recycle_reason(self):
+        return self.policy.reason(self.pages, self.tree)
+    
+    def close(self):
+        quit_driver(self.driver)
+
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# JSON Lines 로그에 싣는 구조화 필드 (logger.info(..., extra={...}) 로 전달)
+LOG_FIELDS = ("event", "workbook", "sheet", "row", "url", "status", "kind", "duration", "attempts")
+
+_log_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """로그 레코드 하나를 JSON 한 줄로 기록 (extra 로 넘긴 구조화 필드 포함)"""
+    
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """예외 추적 정보를 메시지에 합치지 않고 exc_text 로 따로 넘기는 QueueHandler
+    
+    기본 prepare 는 추적 정보를 메시지에 붙이고 exc_info/exc_text 를 지우므로
+    JSON Lines 로그의 exc 필드가 비게 된다.
+    """
+    
+    def prepare(self, record):
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+def prune_logs(log_dir, keep):
+    """오래된 실행 로그 삭제 (돌려 쓴 파일 포함, 최근 keep 개 실행만 남김)"""
+    if keep <= 0:
+        return
+    runs = {}
+    for name in os.listdir(log_dir):
+        if name.startswith("conversion_"):
+            runs.setdefault(name.split(".")[0], []).append(name)
+    for run in sorted(runs)[:-keep]:
+        for name in runs[run]:
+            try:
+                os.remove(os.path.join(log_dir, name))
+            except OSError:
+                pass
+
+
+def setup_logging(log_dir=LOG_DIR, settings=None):
+    """로그 시스템 초기화 (파일 + 콘솔)
+    
+    로그는 큐(QueueHandler)에 넣기만 하고 실제 파일/콘솔 출력은 QueueListener 스레드가
+    맡으므로 작업자가 디스크나 콘솔 때문에 멈추지 않는다. 다시 부르면 이전 출력을 닫고 교체.
+    """
+    global _log_listener
+    settings = settings or DEFAULT_SETTINGS
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jsonl = settings["log_format"] == "jsonl"
+    log_file = os.path.join(log_dir, f"conversion_{timestamp}.{'jsonl' if jsonl else 'log'}")
+    
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=int(settings["log_max_mb"] * 1024 * 1024),
+        backupCount=settings["log_backup_count"], encoding='utf-8')
+    file_handler.setFormatter(JsonLinesFormatter() if jsonl else logging.Formatter(LOG_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    prune_logs(log_dir, settings["log_keep_files"])
+    
+    stop_logging()
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                   respect_handler_level=True)
+    _log_listener.start()
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(LogQueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    return logging.getLogger("excel_to_pdf")
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 기록하고 출력 스레드 종료"""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+atexit.register(stop_logging)
+
+
+def load_settings(config_dir=CONFIG_DIR, logger=None):
+    """설정 파일 로드 (없는 항목은 기본값 사용)"""
+    settings = dict(DEFAULT_SETTINGS)
+    settings_file = os.path.join(config_dir, "settings.json")
+    if os.path.exists(settings_file):
+        try:
+            with open(settings_file, 'r', encoding='utf-8') as f:
+                settings.update(json.load(f))
+        except Exception as e:
+            (logger or logging.getLogger("excel_to_pdf")).warning(f"설정 파일을 읽을 수 없어 기본값 사용: {str(e)}")
+    return settings
+
+
+def save_settings(settings, config_dir=CONFIG_DIR):
+    """설정 파일 저장"""
+    settings_file = os.path.join(config_dir, "settings.json")
+    with open(settings_file, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, ensure_ascii=False, indent=2)
+
+
+def load_google_accounts(config_dir=CONFIG_DIR):
+    """저장된 구글 계정 목록 로드"""
+    accounts_file = os.path.join(config_dir, "google_accounts.json")
+    if os.path.exists(accounts_file):
+        try:
+            with open(accounts_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return []
+    return []
+
+
+def get_profile_dir(account, profile_root=PROFILE_ROOT):
+    """계정별 크롬 프로필 디렉토리"""
+    profile_dir = os.path.join(profile_root, account.replace("@", "_at_"))
+    if not os.path.exists(profile_dir):
+        os.makedirs(profile_dir)
+    return profile_dir
+
+
+# 요약에 표시할 단계 이름
+PHASE_LABELS = {
+    "queue_wait": "큐 대기",
+    "navigate": "페이지 이동",
+    "ready": "로딩 대기",
+    "print": "PDF 인쇄",
+    "write": "수신/저장",
+    "export": "시트 내보내기",
+    "output": "결과 저장",
+    "total": "전체",
+}
+
+
+def format_summary(summary):
+    """변환 결과 요약 문구"""
+    minutes = int(summary['elapsed']) // 60
+    seconds = int(summary['elapsed']) % 60
+    result_msg = f"""
+변환 완료!
+
+총 처리: {summary['processed']}개
+성공: {summary['success']}개
+실패: {summary['failed']}개
+건너뜀 (이전 완료): {summary['skipped']}개
+소요 시간: {minutes}분 {seconds}초
+처리 속도: 분당 {summary.get('pages_per_minute', 0):.1f}페이지
+
+저장 위치: {summary['save_folder']}
+        """
+    phases = summary.get('phases')
+    if phases:
+        result_msg += "\n단계별 소요 시간 (초, p50 / p95 / p99):"
+        for phase, values in phases.items():
+            result_msg += (f"\n  {PHASE_LABELS.get(phase, phase)}: "
+                           f"{values['p50']:.2f} / {values['p95']:.2f} / {values['p99']:.2f}")
+    requests = summary.get('requests')
+    if requests and (requests['allowed'] or requests['blocked']):
+        result_msg += f"\n페이지 요청: 허용 {requests['allowed']}개 / 차단 {requests['blocked']}개\n"
+    workbooks = summary.get('workbooks') or []
+    if len(workbooks) > 1:
+        result_msg += "\n통합문서별 결과 (성공 / 실패 / 건너뜀):"
+        for book in workbooks:
+            name = os.path.basename(book['workbook'])
+            if book['error']:
+                result_msg += f"\n  {name}: 읽기 실패 - {book['error']}"
+            else:
+                result_msg += f"\n  {name}: {book['success']} / {book['failed']} / {book['skipped']}"
+                if book['failed_log_path']:
+                    result_msg += f" (실패 목록: {book['failed_log_path']})"
+    if summary.get('metrics_path'):
+        result_msg += f"\n\n작업별 측정 기록:\n{summary['metrics_path']}"
+    if summary.get('failed_log_path'):
+        result_msg += f"\n\n실패 목록이 저장되었습니다:\n{summary['failed_log_path']}"
+    return result_msg
+
+
+class WorkbookRun:
+    """배치 안의 통합문서 하나 (출력 폴더와 결과 집계)"""
+    
+    def __init__(self, excel_path, save_folder, sheet_names=None):
+        self.excel_path = os.path.abspath(excel_path)
+        self.save_folder = save_folder
+        self.sheet_names = sheet_names  # None 이면 전체 시트
+        self.total = 0
+        self.success = 0
+        self.failed = 0
+        self.skipped = 0
+        self.failed_items = []
+        self.error = None  # 통합문서를 읽지 못한 경우
+    
+    def select_sheets(self, logger):
+        """처리할 시트 이름 (지정한 시트 중 없는 것은 경고 후 제외)"""
+        name = os.path.basename(self.excel_path)
+        sheet_names = list_sheet_names(self.excel_path)
+        if self.sheet_names is not None:
+            missing = [sheet for sheet in self.sheet_names if sheet not in sheet_names]
+            if missing:
+                logger.warning(f"{name}: 없는 시트 건너뜀 {missing}")
+            sheet_names = [sheet for sheet in self.sheet_names if sheet in sheet_names]
+        logger.info(f"{name}: 시트 {sheet_names}")
+        return sheet_names
+
+
+def write_failed_report(excel_path, save_folder, items):
+    """통합문서의 실패 항목 보고서(failed_items.json) 저장, 경로 반환"""
+    path = os.path.join(save_folder, "failed_items.json")
+    report = {
+        'workbook': excel_path,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'failed': len(items),
+        'by_kind': {},
+        'items': items,
+    }
+    for item in items:
+        report['by_kind'][item['kind']] = report['by_kind'].get(item['kind'], 0) + 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+class PrewarmedBrowser:
+    """변환 시작 전에 백그라운드에서 띄우는 크롬 하나 (ConversionEngine.prewarm)"""
+    
+    def __init__(self, account, headless, worker_count, create):
+        self.account = account
+        self.headless = headless
+        self.worker_count = worker_count
+        self.renderer = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(create,), daemon=True)
+        self.thread.start()
+    
+    def run(self, create):
+        try:
+            self.renderer = create()
+        except Exception as e:
+            self.error = e
+    
+    def result(self):
+        """띄울 때까지 기다렸다가 렌더러 반환 (실패했으면 None)"""
+        self.thread.join()
+        return self.renderer
+
+
+class RendererSlot:
+    """작업자 하나가 쓰는 렌더러와 구글 시트 내보내기
+    
+    시작, 작업 사이의 재활용·비정상 종료 후 재시작, 예외를 ConversionError 로 분류하는
+    렌더링을 맡는다. ConversionEngine 작업자와 분산 모드 작업자(excel_to_pdf_cluster)가 함께 쓴다.
+    """
+    
+    def __init__(self, engine, account, index, worker_count):
+        self.engine = engine
+        self.account = account
+        self.index = index
+        self.worker_count = worker_count
+        self.renderer = None
+        self.exporter = None
+        self.restart_reason = None
+    
+    def start(self, renderer=None):
+        """렌더러 시작 (renderer 를 주면 미리 띄운 것을 사용), 실패하면 예외"""
+        if renderer is None:
+            renderer = self.engine.create_renderer(self.account, self.index, self.worker_count)
+        self.attach(renderer)
+    
+    def attach(self, renderer):
+        self.renderer = renderer
+        self.exporter = None
+        if self.engine.settings["sheets_fast_path"]:
+            self.exporter = SheetsExporter.from_settings(renderer, self.engine.settings, self.engine.logger)
+    
+    def prepare(self):
+        """크롬이 죽었거나 재활용 기준에 걸렸으면 새로 띄움 (작업 사이에 호출), 실패하면 예외"""
+        reason = self.restart_reason or self.renderer.recycle_reason()
+        if reason:
+            # 재활용이면 같은 크롬을 쓰는 다른 작업자의 변환이 끝나기를 기다렸다가 닫음
+            self.attach(self.engine.restart_renderer(self.account, self.index, self.worker_count,
+                                                     self.renderer, reason,
+                                                     drain=self.restart_reason is None))
+        self.restart_reason = None
+    
+    def render(self, task, timer):
+        """작업 하나를 임시 PDF 로 렌더링, (경로, None) 또는 (None, ConversionError)
+        
+        분류되지 않은 예외도 ConversionError 로 바꿔 돌려주므로 작업자가 죽지 않는다.
+        크롬이 죽었으면(driver_crash) 다음 prepare 에서 새로 띄운다.
+        """
+        try:
+            return self.engine.render_task(self.renderer, task, self.exporter, timer), None
+        except Exception as e:
+            error = classify_error(e)
+        if error.kind == "driver_crash":
+            self.restart_reason = "비정상 종료"
+        return None, error
+
+
+class ConversionEngine:
+    """화면과 무관한 변환 파이프라인
+    
+    링크 추출 → 작업 기록 확인 → 작업자 풀(크롬 드라이버) 변환 → 결과 정리까지
+    담당한다. 진행 상황은 on_event(event, data) 콜백으로 알린다.
+    - "started":  {"total", "skipped"}
+    - "progress": {"sheet", "processed", "total", "success", "failed"}
+    """
+    
+    def __init__(self, settings, config_dir=CONFIG_DIR, logger=None, on_event=None,
+                 profile_root=PROFILE_ROOT):
+        self.settings = settings
+        self.config_dir = config_dir
+        self.profile_root = profile_root  # 계정별 크롬 프로필 위치
+        self.logger = logger or logging.getLogger("excel_to_pdf")
+        self.on_event = on_event
+        
+        self.save_folder = None
+        self.headless = False
+        self.drivers = []
+        self.worker_profiles = []
+        self.driver_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.is_running = False
+        self.is_paused = False
+        self.total_links = 0
+        self.total_processed = 0
+        self.total_success = 0
+        self.total_failed = 0
+        self.total_skipped = 0
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.books = {}
+        self.merged_outputs = {}
+        self.start_time = None
+        self.journal = None
+        self.pdf_cache = None
+        self.metrics = None
+        self.writer = None
+        self.rate_limiter = None
+        self.spool_dir = None
+        self.spool_seq = itertools.count(1)
+        self.scheduler = None
+        self.worker_slots = {}
+        self.cdp_renderers = {}
+        self.prewarmed = None
+        self.warm_renderers = {}
+        
+        if not os.path.exists(self.config_dir):
+            os.makedirs(self.config_dir)
+    
+    def emit(self, event, **data):
+        if self.on_event:
+            self.on_event(event, data)
+    
+    def pause(self):
+        self.is_paused = True
+        self.logger.info("변환 일시정지")
+    
+    def resume(self):
+        self.is_paused = False
+        self.logger.info("변환 재개")
+    
+    def stop(self):
+        self.is_running = False
+        if self.scheduler:
+            self.scheduler.cancel()
+        self.logger.info("변환 중지 요청")
+    
+    def run(self, excel_path, sheet_names, col, account, save_folder, headless=False):
+        """통합문서 하나 변환 (끝날 때까지 블록), 결과 요약 dict 반환
+        
+        account 에 계정 목록을 주면 계정마다 브라우저를 띄워 동시에 처리하고
+        (settings["account_routing"] 규칙으로 배정), 권한 없음으로 실패한 링크는
+        다른 계정으로 다시 시도한다.
+        """
+        return self.run_batch([WorkbookRun(excel_path, save_folder, sheet_names)], col, account, headless)
+    
+    def run_batch(self, books, col, account, headless=False):
+        """여러 통합문서(WorkbookRun 목록)를 하나의 작업 큐로 변환, 결과 요약 dict 반환
+        
+        통합문서는 차례로 읽어 바로 큐에 넣으므로 첫 파일을 읽자마자 변환이 시작되고,
+        크롬은 배치가 끝날 때까지 계속 사용한다. 결과는 통합문서마다 save_folder 에 저장.
+        """
+        accounts = [account] if isinstance(account, str) else list(dict.fromkeys(account))
+        self.books = {book.excel_path: book for book in books}
+        self.merged_outputs = {}
+        if len(books) == 1:
+            self.save_folder = books[0].save_folder
+        else:
+            self.save_folder = os.path.commonpath([os.path.abspath(book.save_folder) for book in books])
+        self.headless = headless
+        self.total_links = 0
+        self.total_processed = 0
+        self.total_success = 0
+        self.total_failed = 0
+        self.total_skipped = 0
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.is_running = True
+        self.is_paused = False
+        self.start_time = time.time()
+        
+        try:
+            worker_count = self.settings["worker_count"]
+            self.logger.info(f"변환 시작 - 계정: {', '.join(accounts)}, 열: {col}, "
+                             f"통합문서: {len(books)}개, 작업 수: {worker_count}")
+            blocked_urls = blocked_url_patterns(self.settings)
+            if blocked_urls:
+                self.logger.info(f"요청 차단 규칙 {len(blocked_urls)}개 적용")
+            
+            self.journal = JobJournal(os.path.join(self.config_dir, "job_journal.sqlite3"),
+                                      flush_interval=self.settings["journal_flush_interval"])
+            self.journal.start()
+            if self.settings["pdf_cache"]:
+                self.pdf_cache = PdfCache.from_settings(self.settings, self.config_dir, self.logger)
+            self.rate_limiter = HostRateLimiter.from_settings(self.settings, self.logger)
+            
+            # 작업별 단계 시간 기록
+            os.makedirs(self.save_folder, exist_ok=True)
+            self.metrics = RunMetrics.from_settings(self.settings, self.save_folder)
+            
+            # 기록 단계 시작 (렌더링 결과는 로컬 임시 폴더를 거쳐 저장)
+            self.spool_dir = tempfile.mkdtemp(prefix="excel_to_pdf_spool_")
+            output_mode = self.settings["output_mode"]
+            merger = None
+            if output_mode in ("merged", "both"):
+                merger = SheetMerger(self.spool_dir, self.merged_path,
+                                     self.settings["merge_part_rows"], self.logger)
+            self.writer = OutputWriter(self.job_output_path, self.finish_task,
+                                       write_rows=output_mode != "merged",
+                                       merger=merger,
+                                       pdf_cache=self.pdf_cache,
+                                       maxsize=self.settings["writer_queue_size"],
+                                       logger=self.logger)
+            self.writer.start()
+            
+            # 통합문서를 하나씩 읽어 작업 등록, 첫 통합문서를 넣은 뒤 작업자 시작
+            self.scheduler = TaskScheduler(accounts, self.settings["account_routing"])
+            workers = []
+            for book in books:
+                if not self.is_running:
+                    break
+                try:
+                    task_count = self.enqueue_workbook(book, col, merger)
+                except Exception as e:
+                    if len(books) == 1:
+                        raise
+                    book.error = str(e)
+                    self.logger.error(f"통합문서 읽기 실패: {book.excel_path} - {str(e)}")
+                    continue
+                
+                if not workers:
+                    # 작업자 시작 (계정별로 나눠 띄우고, 작업자마다 별도의 크롬 드라이버 사용)
+                    # 통합문서 하나면 링크 수보다 많은 브라우저는 띄우지 않음
+                    per_account = max(1, worker_count // len(accounts))
+                    if len(books) == 1:
+                        per_account = max(1, min(per_account, task_count))
+                    self.adopt_prewarmed(accounts, per_account)
+                    workers = self.start_workers(accounts, per_account)
+            self.scheduler.close()
+            
+            # 시간 제한을 두고 기다려야 Ctrl+C 신호를 받을 수 있음
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(0.5)
+            self.writer.close()
+            
+            # 처리되지 못한 작업은 실패로 기록 (모든 작업자가 비정상 종료된 경우)
+            if self.is_running:
+                now = time.time()
+                error = ConversionError("no_worker", "크롬을 시작하지 못해 처리되지 않음")
+                for task in self.scheduler.drain():
+                    for job in task.jobs:
+                        self.record_result(job, now, now, error, task.attempts)
+            
+            return self.finish_conversion()
+        finally:
+            self.is_running = False
+            self.cleanup()
+    
+    def enqueue_workbook(self, book, col, merger=None):
+        """통합문서의 링크를 읽어 작업 큐에 등록, 등록한 작업(URL) 수 반환"""
+        name = os.path.basename(book.excel_path)
+        sheet_names = book.select_sheets(self.logger)
+        
+        # URL 열 추출 (한 번만 스트리밍으로 읽음) 및 이미 완료된 행 건너뛰기
+        all_jobs = jobs = extract_link_jobs(book.excel_path, sheet_names, col)
+        if merger:
+            self.merged_outputs.update(merger.plan(all_jobs))
+        if self.settings["resume_completed"]:
+            jobs = self.skip_completed_jobs(jobs, book)
+        self.journal.register(jobs)
+        book.total = len(jobs)
+        
+        # 같은 URL 묶기
+        tasks = group_render_tasks(jobs, self.settings["dedupe_urls"])
+        if len(tasks) < len(jobs):
+            self.logger.info(f"{name}: 중복 URL 정리 {len(jobs)}개 행 → {len(tasks)}개 URL")
+        
+        # 시트별 폴더 생성
+        os.makedirs(book.save_folder, exist_ok=True)
+        if self.settings["output_mode"] != "merged":
+            for sheet_name in dict.fromkeys(job.sheet for job in jobs):
+                sheet_folder = os.path.join(book.save_folder, sheet_name)
+                if not os.path.exists(sheet_folder):
+                    os.makedirs(sheet_folder)
+                    self.logger.info(f"폴더 생성: {sheet_folder}")
+        if merger:
+            merger.expect(jobs)
+            remaining = set(jobs)
+            for job in all_jobs:
+                if job not in remaining:
+                    merger.add_existing(job, self.job_output_path(job))
+        
+        with self.stats_lock:
+            self.total_links += len(jobs)
+            total_links = self.total_links
+        self.logger.info(f"{name}: {len(jobs)}개의 링크 발견 (누적 {total_links}개)")
+        self.emit("started", total=total_links, skipped=self.total_skipped)
+        
+        for task in tasks:
+            self.scheduler.add(task)
+        return len(tasks)
+    
+    def start_workers(self, accounts, per_account):
+        """계정마다 per_account 개의 작업자 스레드 시작"""
+        self.worker_slots = {account: per_account for account in accounts}
+        workers = []
+        for account in accounts:
+            for index in range(per_account):
+                worker = threading.Thread(target=self.conversion_worker,
+                                          args=(index, per_account, account),
+                                          daemon=True)
+                worker.start()
+                workers.append(worker)
+        return workers
+    
+    def prewarm(self, account, headless=False):
+        """변환을 시작하기 전에 계정의 첫 작업자용 크롬을 백그라운드에서 미리 띄움
+        
+        사용자가 파일, 시트, 폴더를 고르는 동안 크롬 시작 시간을 미리 써 두는 용도.
+        run 이 같은 계정, 같은 화면 모드로 시작하면 첫 작업자가 그대로 쓰고 아니면 닫는다.
+        다른 계정으로 다시 부르면 이전 크롬을 닫은 뒤 새로 띄운다.
+        """
+        with self.driver_lock:
+            previous = self.prewarmed
+            if self.is_running or (previous and (previous.account, previous.headless) == (account, headless)):
+                return
+            self.headless = headless
+            worker_count = self.settings["worker_count"]
+            
+            def create():
+                if previous and previous.result():
+                    self.close_renderer(previous.account, previous.renderer)
+                renderer = self.create_renderer(account, 0, worker_count)
+                self.logger.info(f"크롬 미리 실행 완료 ({account})")
+                return renderer
+            
+            self.prewarmed = PrewarmedBrowser(account, headless, worker_count, create)
+    
+    def adopt_prewarmed(self, accounts, per_account):
+        """미리 띄운 크롬이 이번 실행에 맞으면 그 계정의 첫 작업자에게 넘기고 아니면 닫음"""
+        with self.driver_lock:
+            prewarmed, self.prewarmed = self.prewarmed, None
+        if prewarmed is None:
+            return
+        renderer = prewarmed.result()
+        if renderer is None:
+            self.logger.warning(f"크롬 미리 실행 실패 ({prewarmed.account}): {str(prewarmed.error)}")
+            return
+        
+        if self.settings["renderer"] == "cdp":
+            fits = renderer.tab_count >= per_account
+        else:
+            # 작업자가 여러 명이면 모두 복제 프로필을 써야 원래 프로필이 잠기지 않음
+            fits = prewarmed.worker_count > 1 or per_account == 1
+        if prewarmed.account in accounts and prewarmed.headless == self.headless and fits:
+            self.logger.info(f"미리 실행한 크롬 사용 ({prewarmed.account})")
+            if self.settings["renderer"] != "cdp":
+                self.warm_renderers[prewarmed.account] = renderer
+            return
+        self.logger.info(f"미리 실행한 크롬이 이번 설정과 맞지 않아 닫음 ({prewarmed.account})")
+        self.close_renderer(prewarmed.account, renderer)
+    
+    def conversion_worker(self, index, worker_count, account):
+        """작업 큐에서 링크를 꺼내 PDF로 변환하는 작업자"""
+        slot = RendererSlot(self, account, index, worker_count)
+        try:
+            slot.start(self.warm_renderers.pop(account, None) if index == 0 else None)
+        except Exception as e:
+            self.logger.error(f"작업자 {index + 1} ({account}) 크롬 드라이버 시작 실패: {str(e)}")
+            self.retire_worker(account)
+            return
+        
+        while True:
+            # 일시정지 체크
+            while self.is_paused and self.is_running:
+                time.sleep(0.5)
+            
+            if not self.is_running:
+                break
+            
+            # 크롬이 죽었거나 재활용 기준(페이지 수, 메모리)에 걸리면 작업 사이에 새로 띄움
+            try:
+                slot.prepare()
+            except Exception as e:
+                self.logger.error(f"작업자 {index + 1} ({account}) 크롬 재시작 실패: {str(e)}")
+                self.retire_worker(account)
+                return
+            
+            task = self.scheduler.get(account)
+            if task is None:
+                break
+            
+            # 호스트 속도 제한에 걸리면 잠시 미루고 다른 작업부터 처리
+            host = (urlparse(task.url).hostname or "").lower()
+            if self.rate_limiter:
+                wait = self.rate_limiter.try_acquire(host)
+                if wait:
+                    self.scheduler.defer(task, wait)
+                    continue
+            
+            timer = PhaseTimer(time.monotonic() - task.queued_at)
+            spool_path, error = slot.render(task, timer)
+            with self.stats_lock:
+                self.requests_allowed += timer.requests - timer.blocked
+                self.requests_blocked += timer.blocked
+            if self.rate_limiter:
+                throttled = timer.throttled > 0 or (error is not None and error.kind == "throttled")
+                self.rate_limiter.release(host, throttled=throttled, healthy=error is None)
+            
+            if error is None:
+                # 디스크 기록은 기록 단계에 넘기고 바로 다음 링크로
+                self.writer.submit(task, spool_path, timer)
+                continue
+            
+            if error.kind == "recycled":
+                # 크롬 재활용으로 받지 못한 작업은 시도 횟수에 넣지 않고 바로 다시 처리
+                self.scheduler.defer(task, 0)
+                continue
+            if isinstance(error, AccessDeniedError):
+                retry_account = self.scheduler.reroute(task, account)
+                if retry_account:
+                    self.logger.warning(f"접근 권한 없음 ({account}), {retry_account} 계정으로 재시도: {task.url}")
+                    continue
+            elif error.transient and task.attempts + 1 < self.settings["retry_max_attempts"]:
+                attempts = task.attempts + 1
+                delay = retry_delay(attempts, self.settings["retry_base_delay"], self.settings["retry_max_delay"])
+                self.logger.warning(f"일시적 실패 [{error.kind}] {task.url} - {str(error)} "
+                                    f"({attempts}/{self.settings['retry_max_attempts']}회, {delay:.0f}초 후 재시도)")
+                self.scheduler.defer(task._replace(attempts=attempts), delay)
+                continue
+            
+            self.writer.failed(task)
+            self.finish_task(task, timer, error)
+    
+    def finish_task(self, task, timer, error=None):
+        """작업 하나의 최종 결과 기록 (성공은 기록 단계에서 저장이 끝난 뒤 호출)"""
+        timer.phases["total"] = timer.total()
+        finished_at = time.time()
+        for job in task.jobs:
+            self.record_result(job, timer.started_at, finished_at, error, task.attempts + 1, timer)
+        self.scheduler.done()
+    
+    def create_renderer(self, account, index, worker_count):
+        """작업자가 사용할 렌더러 생성
+        
+        selenium: 작업자마다 크롬 드라이버 하나 (필요하면 프로필 복제)
+        cdp: 계정마다 크롬 하나를 띄우고 같은 계정 작업자들이 탭 풀을 공유
+        """
+        readiness = PageReadiness.from_settings(self.settings, self.logger)
+        if self.settings["renderer"] == "cdp":
+            from excel_to_pdf_cdp import CdpRenderer
+            with self.driver_lock:
+                renderer = self.cdp_renderers.get(account)
+                if renderer is None:
+                    renderer = CdpRenderer(get_profile_dir(account, self.profile_root), worker_count, readiness,
+                                           self.settings, self.logger, headless=self.headless)
+                    self.cdp_renderers[account] = renderer
+            return renderer
+        
+        profile_dir = self.prepare_worker_profile(account, index, worker_count)
+        driver = self.setup_chrome_driver(profile_dir)
+        return SeleniumRenderer(driver, readiness, self.settings, self.logger)
+    
+    def restart_renderer(self, account, index, worker_count, renderer, reason, drain=False):
+        """크롬을 정리하고 새 렌더러 생성 (비정상 종료 또는 재활용, drain 은 close_renderer 참고)"""
+        self.logger.warning(f"작업자 {index + 1} ({account}) 크롬 재시작: {reason}")
+        self.close_renderer(account, renderer, drain)
+        return self.create_renderer(account, index, worker_count)
+    
+    def close_renderer(self, account, renderer, drain=False):
+        """렌더러 하나를 닫고 정리 목록에서 뺌
+        
+        drain 이면 (cdp 재활용) 같은 계정 작업자들의 진행 중인 변환이 끝난 뒤에 닫는다.
+        """
+        if self.settings["renderer"] == "cdp":
+            with self.driver_lock:
+                # 같은 계정의 다른 작업자가 이미 재시작했으면 그것을 사용
+                if self.cdp_renderers.get(account) is renderer:
+                    del self.cdp_renderers[account]
+                    renderer.close(drain=drain)
+            return
+        
+        with self.driver_lock:
+            if renderer.driver in self.drivers:
+                self.drivers.remove(renderer.driver)
+        renderer.close()
+    
+    def retire_worker(self, account):
+        """작업자 하나가 시작하지 못함, 계정의 마지막 작업자였으면 계정 제외"""
+        with self.driver_lock:
+            self.worker_slots[account] -= 1
+            if self.worker_slots[account] > 0:
+                return
+        now = time.time()
+        error = ConversionError("no_worker", f"{account} 계정의 크롬을 시작하지 못함")
+        for task in self.scheduler.retire(account):
+            for job in task.jobs:
+                self.record_result(job, now, now, error, task.attempts)
+    
+    def render_task(self, renderer, task, exporter=None, timer=None):
+        """URL 하나를 로컬 임시 폴더에 PDF로 받아 경로 반환 (실패하면 ConversionError)
+        
+        최종 위치로 옮기기, 중복 행 채우기, 캐시 저장은 기록 단계(OutputWriter)가 맡는다.
+        """
+        spool_name = f"task_{next(self.spool_seq)}"
+        spool_path = os.path.join(self.spool_dir, f"{spool_name}.pdf")
+        timer = timer or PhaseTimer()
+        
+        if self.pdf_cache and self.pdf_cache.fetch(task.url, spool_path):
+            timer.source = "cache"
+            timer.lap("write")
+            self.logger.info(f"캐시 사용: {task.url}")
+        elif exporter and exporter.export(task.url, spool_path):
+            timer.source = "sheets"
+            timer.lap("export")
+        else:
+            # 내보내기를 시도했다 실패했으면 그 시간도 export 로 기록
+            if exporter and sheets_export_url(task.url):
+                timer.lap("export")
+            # PDF 변환
+            timer.source = "browser"
+            renderer.convert_to_pdf(task.url, self.spool_dir, spool_name, timer)
+            if exporter and sheets_export_url(task.url):
+                # 브라우저 방문으로 갱신된 로그인 쿠키를 다음 내보내기에 사용
+                exporter.sync_cookies()
+        
+        try:
+            timer.bytes = os.path.getsize(spool_path)
+        except OSError:
+            pass
+        return spool_path
+    
+    def job_output_path(self, job):
+        """작업의 PDF 저장 경로"""
+        return os.path.join(self.books[job.workbook].save_folder, job.sheet, f"row_{job.row}.pdf")
+    
+    def merged_path(self, workbook, sheet):
+        """시트 병합 PDF 저장 경로"""
+        return os.path.join(self.books[workbook].save_folder, f"{sheet}.pdf")
+    
+    def result_path(self, job):
+        """작업 기록에 남기는 결과 경로 (병합 PDF만 만들면 시트 병합 PDF, 아니면 행 PDF)"""
+        if self.settings["output_mode"] == "merged":
+            return self.merged_outputs.get(job) or self.merged_path(job.workbook, job.sheet)
+        return self.job_output_path(job)
+    
+    def skip_completed_jobs(self, jobs, book):
+        """작업 기록상 완료되었고 결과 PDF도 남아 있는 작업 제외
+        
+        병합 PDF만 만드는 경우(output_mode="merged")는 행 PDF가 남지 않으므로 시트의 모든 행이
+        완료되었고 병합 PDF가 있을 때만 그 시트를 건너뛰고, 아니면 시트 전체를 다시 변환한다.
+        """
+        completed = self.journal.completed_outputs(book.excel_path)
+        done = set()
+        for job in jobs:
+            output_path = completed.get((job.sheet, job.row, job.url))
+            if output_path == self.result_path(job) and os.path.exists(output_path):
+                done.add(job)
+        if self.settings["output_mode"] == "merged":
+            unfinished = {job.sheet for job in jobs if job not in done}
+            done = {job for job in done if job.sheet not in unfinished}
+        remaining = [job for job in jobs if job not in done]
+        book.skipped += len(done)
+        if book.skipped:
+            self.total_skipped += book.skipped
+            self.logger.info(f"{os.path.basename(book.excel_path)}: 이전 실행에서 완료된 {book.skipped}개 건너뜀")
+        return remaining
+    
+    def record_result(self, job, started_at, finished_at, error=None, attempts=1, timer=None):
+        """변환 결과를 통계와 작업 기록에 반영하고 진행 상황 알림 (error 가 None 이면 성공)"""
+        sheet_name, row, url = job.sheet, job.row, job.url
+        book = self.books[job.workbook]
+        if timer and self.metrics:
+            self.metrics.record(job, timer, error, attempts)
+        if self.journal:
+            if error is None:
+                self.journal.record(job, "done", started_at, finished_at, self.result_path(job))
+            else:
+                self.journal.record(job, "failed", started_at, finished_at,
+                                    error=f"{error.kind}: {str(error)}")
+        
+        fields = {
+            "event": "result",
+            "workbook": os.path.basename(job.workbook),
+            "sheet": sheet_name,
+            "row": row,
+            "url": url,
+            "status": "done" if error is None else "failed",
+            "kind": error.kind if error is not None else None,
+            "duration": round(timer.total(), 3) if timer else None,
+            "attempts": attempts,
+        }
+        if error is None:
+            self.logger.info(f"✓ 성공: {url} → row_{row}.pdf", extra=fields)
+        else:
+            self.logger.error(f"✗ 실패 [{error.kind}]: {url} - {str(error)}", extra=fields)
+        
+        with self.stats_lock:
+            self.total_processed += 1
+            
+            if error is None:
+                self.total_success += 1
+                book.success += 1
+            else:
+                self.total_failed += 1
+                book.failed += 1
+                book.failed_items.append({
+                    'sheet': sheet_name,
+                    'row': row,
+                    'url': url,
+                    'kind': error.kind,
+                    'error': str(error),
+                    'attempts': attempts,
+                })
+            
+            # 진행 상태 알림
+            self.emit("progress", sheet=sheet_name, processed=self.total_processed,
+                      total=self.total_links, success=self.total_success,
+                      failed=self.total_failed)
+    
+    def prepare_worker_profile(self, account, index, worker_count):
+        """작업자용 프로필 준비
+        
+        크롬은 user-data-dir 을 잠그므로 작업자가 여러 명이면
+        계정 프로필을 작업자마다 임시 폴더로 복제해서 사용한다.
+        """
+        profile_dir = get_profile_dir(account, self.profile_root)
+        if worker_count == 1:
+            return profile_dir
+        
+        clone_dir = tempfile.mkdtemp(prefix=f"excel_to_pdf_worker{index + 1}_")
+        shutil.copytree(profile_dir, clone_dir, ignore=PROFILE_COPY_IGNORE, dirs_exist_ok=True)
+        with self.driver_lock:
+            self.worker_profiles.append(clone_dir)
+        self.logger.info(f"작업자 {index + 1} 프로필 복제: {clone_dir}")
+        return clone_dir
+    
+    def setup_chrome_driver(self, profile_dir):
+        """크롬 드라이버 설정"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        chrome_options = Options()
+        
+        # 프로필 디렉토리 설정
+        chrome_options.add_argument(f"user-data-dir={profile_dir}")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        if self.headless:
+            # 새 헤드리스 모드: 창 없이 실행되어 시작이 빠르고 메모리를 적게 사용
+            chrome_options.add_argument("--headless=new")
+        if self.settings["lean_browser"]:
+            for arg in LEAN_BROWSER_ARGS:
+                chrome_options.add_argument(arg)
+        
+        # PDF 인쇄 설정
+        prefs = {
+            "printing.print_preview_sticky_settings.appState": json.dumps({
+                "recentDestinations": [{
+                    "id": "Save as PDF",
+                    "origin": "local",
+                    "account": ""
+                }],
+                "selectedDestinationId": "Save as PDF",
+                "version": 2
+            }),
+            "savefile.default_directory": self.save_folder
+        }
+        chrome_options.add_experimental_option("prefs", prefs)
+        chrome_options.add_argument("--kiosk-printing")
+        
+        # 페이지 준비 판단은 PageReadiness 가 담당 (DOMContentLoaded 에서 바로 반환)
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        
+        driver = webdriver.Chrome(options=chrome_options)
+        with self.driver_lock:
+            self.drivers.append(driver)
+        driver.set_page_load_timeout(self.settings["page_ready_timeout"])
+        blocked_urls = blocked_url_patterns(self.settings)
+        if blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        self.logger.info(f"크롬 드라이버 시작 - 프로필: {profile_dir}")
+        return driver
+    
+    def finish_conversion(self):
+        """변환 완료 처리, 결과 요약 반환"""
+        elapsed = time.time() - self.start_time
+        summary = {
+            'processed': self.total_processed,
+            'success': self.total_success,
+            'failed': self.total_failed,
+            'skipped': self.total_skipped,
+            'elapsed': elapsed,
+            'save_folder': self.save_folder,
+            'failed_log_path': None,
+            'pages_per_minute': self.total_success * 60 / elapsed if elapsed > 0 else 0.0,
+            'phases': {},
+            'metrics_path': None,
+            'requests': {'allowed': self.requests_allowed, 'blocked': self.requests_blocked},
+        }
+        if self.rate_limiter:
+            for host, (rate, limit) in self.rate_limiter.snapshot().items():
+                self.logger.info(f"호스트 속도 ({host}): 초당 {rate}회, 동시 {limit}개")
+        if self.metrics:
+            self.metrics.close()
+            summary['phases'] = self.metrics.summary()
+            summary['metrics_path'] = self.metrics.path
+        
+        # 통합문서별 결과, 실패 항목 보고서 저장 (JSON)
+        workbooks = []
+        for book in self.books.values():
+            fail_log_path = None
+            if book.failed_items:
+                fail_log_path = write_failed_report(book.excel_path, book.save_folder, book.failed_items)
+                self.logger.info(f"실패 목록 저장: {fail_log_path}")
+            workbooks.append({
+                'workbook': book.excel_path,
+                'save_folder': book.save_folder,
+                'total': book.total,
+                'success': book.success,
+                'failed': book.failed,
+                'skipped': book.skipped,
+                'error': book.error,
+                'failed_log_path': fail_log_path,
+            })
+        summary['workbooks'] = workbooks
+        if len(workbooks) == 1:
+            summary['failed_log_path'] = workbooks[0]['failed_log_path']
+        
+        self.logger.info("=" * 50)
+        self.logger.info(format_summary(summary))
+        self.logger.info("=" * 50)
+        return summary
+    
+    def cleanup(self):
+        """리소스 정리 (변환하지 않고 끝낼 때는 미리 띄운 크롬도 닫음)"""
+        with self.driver_lock:
+            prewarmed, self.prewarmed = self.prewarmed, None
+            self.warm_renderers = {}
+        if prewarmed:
+            prewarmed.result()
+        
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.metrics:
+            self.metrics.close()
+        if self.spool_dir:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            self.spool_dir = None
+        
+        with self.driver_lock:
+            drivers, self.drivers = self.drivers, []
+            profiles, self.worker_profiles = self.worker_profiles, []
+            cdp_renderers, self.cdp_renderers = list(self.cdp_renderers.values()), {}
+        
+        for renderer in cdp_renderers:
+            try:
+                renderer.close()
+                self.logger.info("크롬(CDP) 종료")
+            except Exception:
+                pass
+        
+        # 우리가 띄운 크롬드라이버와 그 자손 크롬만 종료
+        for driver in drivers:
+            quit_driver(driver)
+            self.logger.info("크롬 드라이버 종료")
+        
+        # 작업자용 복제 프로필 삭제
+        for clone_dir in profiles:
+            shutil.rmtree(clone_dir, ignore_errors=True)
+
+
+def expand_workbook_paths(patterns):
+    """파일, 폴더(*.xlsx), 와일드카드를 통합문서 경로 목록으로 펼침 (중복, 엑셀 임시 파일 제외)"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.xlsx")))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if not os.path.basename(path).startswith("~$"):
+                paths.append(os.path.abspath(path))
+    return list(dict.fromkeys(paths))
+
+
+def batch_output_folders(paths, output):
+    """배치 실행 시 통합문서별 출력 폴더 (파일 이름이 겹치면 번호를 붙임)"""
+    folders = []
+    used = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        number = 2
+        while name.lower() in used:
+            name = f"{stem}_{number}"
+            number += 1
+        used.add(name.lower())
+        folders.append(os.path.join(output, name))
+    return folders
+
+
+def plan_workbook_runs(patterns, output, sheet_names=None):
+    """명령줄 인자로 받은 파일/폴더/와일드카드를 WorkbookRun 목록으로 (없으면 빈 목록)
+    
+    파일 하나를 직접 지정하면 기존처럼 출력 폴더에 바로 저장하고, 그 밖에는
+    배치로 보고 통합문서마다 출력 폴더 아래 하위 폴더에 저장한다.
+    """
+    paths = expand_workbook_paths(patterns)
+    batch = len(paths) > 1 or any(os.path.isdir(p) or glob.has_magic(p) for p in patterns)
+    if not batch:
+        return [WorkbookRun(path, output, sheet_names) for path in paths]
+    return [WorkbookRun(path, folder, sheet_names)
+            for path, folder in zip(paths, batch_output_folders(paths, output))]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="엑셀 파일의 링크를 PDF로 일괄 변환 (화면 없이 실행)")
+    parser.add_argument("workbook", nargs="+",
+                        help="엑셀 파일, 폴더 또는 와일드카드 (여러 개면 배치로 처리)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="PDF 저장 폴더 (배치면 통합문서별 하위 폴더에 저장)")
+    parser.add_argument("-a", "--account", nargs="+",
+                        help="사용할 구글 계정 (여러 개면 계정별로 동시에 처리, "
+                             "등록된 계정이 하나뿐이면 생략 가능)")
+    parser.add_argument("--all-accounts", action="store_true",
+                        help="등록된 모든 구글 계정을 동시에 사용")
+    parser.add_argument("-s", "--sheets", nargs="+",
+                        help="처리할 시트 이름 (생략하면 전체 시트)")
+    parser.add_argument("-c", "--col", default="A", help="URL이 있는 열 문자 (기본: A)")
+    parser.add_argument("-w", "--workers", type=int, help="동시 작업 수 (기본: 설정값)")
+    parser.add_argument("--show-browser", action="store_true",
+                        help="헤드리스 대신 크롬 창을 띄움 (처음 로그인할 때 사용)")
+    parser.add_argument("--config-dir", default=CONFIG_DIR, help="설정 폴더")
+    parser.add_argument("--log-format", choices=["text", "jsonl"],
+                        help="로그 파일 형식 (기본: 설정값, jsonl 은 분석용 JSON Lines)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """명령줄 실행 (종료 코드: 0 전부 성공, 1 일부 실패, 2 실행 오류)"""
+    args = parse_args(argv)
+    settings = load_settings(args.config_dir)
+    if args.log_format:
+        settings["log_format"] = args.log_format
+    logger = setup_logging(settings=settings)
+    if args.workers:
+        settings["worker_count"] = max(1, args.workers)
+    
+    col = args.col.strip().upper()
+    if not col.isalpha():
+        logger.error(f"올바른 열 문자가 아닙니다: {args.col}")
+        return 2
+    
+    accounts = args.account
+    if args.all_accounts or not accounts:
+        registered = load_google_accounts(args.config_dir)
+        if args.all_accounts and registered:
+            accounts = registered
+        elif len(registered) == 1 and not args.all_accounts:
+            accounts = registered
+        else:
+            logger.error("--account 로 사용할 구글 계정을 지정하세요.")
+            return 2
+    
+    books = plan_workbook_runs(args.workbook, args.output, args.sheets)
+    if not books:
+        logger.error(f"처리할 엑셀 파일이 없습니다: {' '.join(args.workbook)}")
+        return 2
+    
+    os.makedirs(args.output, exist_ok=True)
+    engine = ConversionEngine(settings, args.config_dir, logger)
+    signal.signal(signal.SIGINT, lambda signum, frame: engine.stop())
+    
+    try:
+        summary = engine.run_batch(books, col, accounts, headless=not args.show_browser)
+    except Exception as e:
+        logger.error(f"변환 중 오류: {str(e)}")
+        return 2
+    if summary['failed'] or any(book['error'] for book in summary['workbooks']):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
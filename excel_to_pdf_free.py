@@ -10,89 +10,81 @@ Excel to PDF 자동 변환 프로그램 (무료 버전) v3.0
 - 진행상황 실시간 표시
 - 에러 로그 기록
 - 완료 후 통계 제공
+
+변환 작업 자체는 excel_to_pdf_engine.ConversionEngine 이 담당하고
+이 파일은 화면(Tk)만 구성한다.
 """
 
 import sys
 import os
 import time
 import threading
-import openpyxl
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from tkinter import Tk, Label, Button, Entry, Listbox, Checkbutton, IntVar, StringVar, Frame, Scrollbar, messagebox, filedialog, ttk, Text, Toplevel
+import queue
+from tkinter import Tk, Label, Button, Entry, Listbox, Checkbutton, IntVar, StringVar, Frame, Scrollbar, Spinbox, messagebox, filedialog, ttk, Text, Toplevel
 from tkinter import MULTIPLE, END, VERTICAL, RIGHT, LEFT, BOTH, Y, X, TOP, BOTTOM, DISABLED, NORMAL
-import base64
-import logging
-from datetime import datetime
 import json
-import psutil
+from excel_to_pdf_engine import (CONFIG_DIR, ConversionEngine, setup_logging, load_settings,
+                                 save_settings, load_google_accounts, format_summary,
+                                 LinkCountCache, list_sheet_names, count_sheet_links)
+
 
 class ExcelToPDFApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Excel to PDF 변환 프로그램 v3.0 (무료)")
-        self.root.geometry("700x850")
+        self.root.geometry("700x880")
         self.root.resizable(False, False)
         
         # 변수 초기화
         self.excel_path = None
         self.save_folder = None
-        self.wb = None
-        self.driver = None
+        self.sheet_names = []
+        self.engine = None
+        self.ui_events = queue.Queue()
+        self.preview_events = queue.Queue()
+        self.preview_generation = 0
+        self.preview_key = None
+        self.preview_polling = False
         self.is_running = False
         self.is_paused = False
-        self.total_processed = 0
-        self.total_success = 0
-        self.total_failed = 0
-        self.failed_items = []
         self.start_time = None
         
         # 설정 디렉토리
-        self.config_dir = os.path.join(os.path.expanduser("~"), "Documents", "Excel_to_PDF_Config")
+        self.config_dir = CONFIG_DIR
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)
         
+        # 설정 로드 (로그 형식도 설정을 따름)
+        self.settings = self.load_settings()
+        
         # 로그 설정
         self.setup_logging()
+        self.link_cache = LinkCountCache(os.path.join(self.config_dir, "link_counts.json"))
         
         # 구글 계정 로드
         self.google_accounts = self.load_google_accounts()
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_logging(self):
         """로그 시스템 초기화"""
-        log_dir = os.path.join(os.path.expanduser("~"), "Documents", "Excel_to_PDF_Logs")
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = os.path.join(log_dir, f"conversion_{timestamp}.log")
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger(__name__)
+        self.logger = setup_logging(settings=self.settings)
         self.logger.info("=" * 50)
         self.logger.info("Excel to PDF 변환 프로그램 시작 (무료 버전)")
         self.logger.info("=" * 50)
         
     def load_google_accounts(self):
         """저장된 구글 계정 목록 로드"""
-        accounts_file = os.path.join(self.config_dir, "google_accounts.json")
-        if os.path.exists(accounts_file):
-            try:
-                with open(accounts_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        return load_google_accounts(self.config_dir)
+    
+    def load_settings(self):
+        """설정 파일 로드 (없는 항목은 기본값 사용)"""
+        return load_settings(self.config_dir)
+    
+    def save_settings(self):
+        """설정 파일 저장"""
+        save_settings(self.settings, self.config_dir)
     
     def save_google_accounts(self):
         """구글 계정 목록 저장"""
@@ -117,12 +109,13 @@ class ExcelToPDFApp:
         Label(main_frame, text="1. 구글 계정 선택", font=("맑은 고딕", 11, "bold")).pack(anchor="w", pady=(0,5))
         
         account_frame = Frame(main_frame)
-        account_frame.pack(fill=X, pady=(0,15))
+        account_frame.pack(fill=X, pady=(0,5))
         
         self.account_var = StringVar()
         self.account_dropdown = ttk.Combobox(account_frame, textvariable=self.account_var, 
                                             state="readonly", width=40, font=("맑은 고딕", 9))
         self.account_dropdown.pack(side=LEFT, padx=(0,10))
+        self.account_dropdown.bind("<<ComboboxSelected>>", self.prewarm_browser)
         self.update_account_dropdown()
         
         Button(account_frame, text="계정 추가", command=self.add_google_account,
@@ -133,6 +126,14 @@ class ExcelToPDFApp:
                bg="#f44336", fg="white", font=("맑은 고딕", 9, "bold"),
                padx=10, pady=5, relief="flat", cursor="hand2").pack(side=LEFT)
         
+        self.all_accounts_var = IntVar(value=0)
+        Checkbutton(main_frame, text="등록된 모든 계정 동시 사용 (권한 없는 링크는 다른 계정으로 재시도)",
+                    variable=self.all_accounts_var, font=("맑은 고딕", 9)).pack(anchor="w")
+        self.prewarm_var = IntVar(value=1 if self.settings["prewarm_browser"] else 0)
+        Checkbutton(main_frame, text="파일을 고르는 동안 크롬 미리 실행 (첫 링크부터 바로 변환)",
+                    variable=self.prewarm_var, command=self.toggle_prewarm,
+                    font=("맑은 고딕", 9)).pack(anchor="w", pady=(0,10))
+        
         # 2. 엑셀 파일 선택
         Label(main_frame, text="2. 엑셀 파일 선택", font=("맑은 고딕", 11, "bold")).pack(anchor="w", pady=(0,5))
         file_frame = Frame(main_frame)
@@ -155,6 +156,16 @@ class ExcelToPDFApp:
         self.col_entry = Entry(col_frame, width=5, font=("맑은 고딕", 11), justify="center")
         self.col_entry.pack(side=LEFT)
         self.col_entry.insert(0, "A")
+        # 열을 바꾸면 시트별 링크 개수를 다시 셈
+        self.col_entry.bind("<Return>", self.load_preview)
+        self.col_entry.bind("<FocusOut>", self.load_preview)
+        
+        Label(col_frame, text="동시 작업 수:", font=("맑은 고딕", 9)).pack(side=LEFT, padx=(30,10))
+        self.worker_var = StringVar(value=str(self.settings["worker_count"]))
+        self.worker_spinbox = Spinbox(col_frame, from_=1, to=max(1, os.cpu_count() or 1),
+                                      textvariable=self.worker_var, width=4,
+                                      font=("맑은 고딕", 11), justify="center")
+        self.worker_spinbox.pack(side=LEFT)
         
         # 4. 시트 선택
         Label(main_frame, text="4. 처리할 시트 선택", font=("맑은 고딕", 11, "bold")).pack(anchor="w", pady=(0,5))
@@ -278,20 +289,112 @@ class ExcelToPDFApp:
         
         if file_path:
             self.excel_path = file_path
-            self.file_label.config(text=os.path.basename(file_path))
+            self.file_label.config(text=f"{os.path.basename(file_path)} (불러오는 중...)")
             self.logger.info(f"엑셀 파일 선택: {file_path}")
+            self.sheet_names = []
+            self.sheet_listbox.delete(0, END)
+            self.preview_key = None
+            self.load_preview()
+            self.prewarm_browser()
+    
+    def load_preview(self, event=None):
+        """시트 목록과 선택한 열의 시트별 URL 개수를 백그라운드에서 읽기
+        
+        읽기 전용 모드로 열어 시트 이름부터 보여주고 개수는 시트마다 채운다.
+        같은 파일(경로, 수정 시각, 크기)과 열은 캐시에서 바로 표시.
+        """
+        col = self.col_entry.get().strip().upper()
+        if not self.excel_path or not col.isalpha():
+            return
+        key = (self.excel_path, col)
+        if key == self.preview_key:
+            return
+        self.preview_key = key
+        self.preview_generation += 1
+        threading.Thread(target=self.read_preview,
+                         args=(self.preview_generation, self.excel_path, col),
+                         daemon=True).start()
+        if not self.preview_polling:
+            self.preview_polling = True
+            self.process_preview_events()
+    
+    def read_preview(self, generation, excel_path, col):
+        """통합문서 미리보기 (작업 스레드, 결과는 preview_events 로만 전달)"""
+        def post(event, data=None):
+            self.preview_events.put((generation, event, data))
+        
+        try:
+            sheets, counts = self.link_cache.lookup(excel_path, col)
+            if sheets is None:
+                sheets = list_sheet_names(excel_path)
+                self.link_cache.store(excel_path, sheets)
+            post("sheets", sheets)
             
-            # 엑셀 파일 열기
+            if counts is None:
+                counts = {}
+                
+                def on_count(sheet, count):
+                    counts[sheet] = count
+                    post("count", (sheet, count))
+                
+                finished = count_sheet_links(excel_path, sheets, col, on_count,
+                                             cancelled=lambda: generation != self.preview_generation)
+                if finished:
+                    self.link_cache.store(excel_path, sheets, col, counts)
+            else:
+                for sheet in sheets:
+                    post("count", (sheet, counts.get(sheet, 0)))
+            post("done", (col, sum(counts.values())))
+        except Exception as e:
+            post("error", str(e))
+    
+    def process_preview_events(self):
+        """미리보기 결과를 화면에 반영 (메인 스레드, 읽는 동안만 주기적으로 실행)"""
+        active = True
+        while True:
             try:
-                self.wb = openpyxl.load_workbook(file_path, data_only=True)
-                self.sheet_listbox.delete(0, END)
-                for sheet_name in self.wb.sheetnames:
-                    self.sheet_listbox.insert(END, sheet_name)
-                messagebox.showinfo("성공", "엑셀 파일을 불러왔습니다!")
-                self.logger.info(f"시트 목록: {self.wb.sheetnames}")
-            except Exception as e:
-                messagebox.showerror("오류", f"파일을 열 수 없습니다: {str(e)}")
-                self.logger.error(f"파일 열기 실패: {str(e)}")
+                generation, event, data = self.preview_events.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.preview_generation:
+                continue  # 다른 파일/열로 바뀐 뒤 도착한 결과
+            if event == "sheets":
+                if data != self.sheet_names:
+                    self.sheet_names = data
+                    self.sheet_listbox.delete(0, END)
+                    for sheet_name in data:
+                        self.sheet_listbox.insert(END, sheet_name)
+                    self.logger.info(f"시트 목록: {data}")
+                else:
+                    for index, sheet_name in enumerate(data):
+                        self.set_sheet_label(index, sheet_name)
+                self.file_label.config(text=f"{os.path.basename(self.excel_path)} (링크 세는 중...)")
+            elif event == "count":
+                sheet_name, count = data
+                self.set_sheet_label(self.sheet_names.index(sheet_name), f"{sheet_name}  (링크 {count}개)")
+            elif event == "done":
+                col, total = data
+                self.file_label.config(text=f"{os.path.basename(self.excel_path)} ({col}열 링크 {total}개)")
+                active = False
+            elif event == "error":
+                self.file_label.config(text=os.path.basename(self.excel_path))
+                self.preview_key = None
+                messagebox.showerror("오류", f"파일을 열 수 없습니다: {data}")
+                self.logger.error(f"파일 열기 실패: {data}")
+                active = False
+        
+        if active:
+            self.root.after(50, self.process_preview_events)
+        else:
+            self.preview_polling = False
+    
+    def set_sheet_label(self, index, text):
+        """시트 목록 항목 문구 변경 (선택 상태 유지)"""
+        selected = self.sheet_listbox.selection_includes(index)
+        self.sheet_listbox.delete(index)
+        self.sheet_listbox.insert(index, text)
+        if selected:
+            self.sheet_listbox.selection_set(index)
     
     def select_folder(self):
         """저장 폴더 선택"""
@@ -305,18 +408,18 @@ class ExcelToPDFApp:
         """일시정지/재개"""
         self.is_paused = not self.is_paused
         if self.is_paused:
+            self.engine.pause()
             self.pause_btn.config(text="재개")
             self.progress_label.config(text="일시정지됨")
-            self.logger.info("변환 일시정지")
         else:
+            self.engine.resume()
             self.pause_btn.config(text="일시정지")
             self.progress_label.config(text="변환 재개...")
-            self.logger.info("변환 재개")
     
     def stop_conversion(self):
         """변환 중지"""
         if messagebox.askyesno("확인", "변환을 중지하시겠습니까?"):
-            self.is_running = False
+            self.engine.stop()
             self.logger.info("사용자가 변환 중지")
     
     def start_conversion(self):
@@ -343,11 +446,27 @@ class ExcelToPDFApp:
             messagebox.showwarning("경고", "올바른 열 문자를 입력하세요 (예: A, B, C).")
             return
         
+        try:
+            worker_count = int(self.worker_var.get())
+            if worker_count < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("경고", "동시 작업 수는 1 이상의 숫자로 입력하세요.")
+            return
+        
+        if worker_count != self.settings["worker_count"]:
+            self.settings["worker_count"] = worker_count
+            self.save_settings()
+        
         # 통계 초기화
-        self.total_processed = 0
-        self.total_success = 0
-        self.total_failed = 0
-        self.failed_items = []
+        self.stat_total.config(text="처리: 0")
+        self.stat_success.config(text="성공: 0")
+        self.stat_failed.config(text="실패: 0")
+        self.progress_bar['value'] = 0
+        # 크롬을 미리 띄운 엔진이 있으면 그대로 사용
+        if self.engine is None or self.engine.start_time is not None:
+            self.engine = ConversionEngine(self.settings, self.config_dir, self.logger,
+                                           on_event=self.on_engine_event)
         self.is_running = True
         self.is_paused = False
         self.start_time = time.time()
@@ -357,229 +476,135 @@ class ExcelToPDFApp:
         self.pause_btn.config(state=NORMAL)
         self.stop_btn.config(state=NORMAL)
         
+        # 위젯 값은 여기(메인 스레드)에서 읽어 작업 스레드에 넘김
+        account = self.account_var.get()
+        if self.all_accounts_var.get():
+            account = list(self.google_accounts)
+        selected_sheets = [self.sheet_names[i] for i in self.sheet_listbox.curselection()]
+        
         # 별도 스레드에서 실행
-        thread = threading.Thread(target=self.run_conversion, daemon=True)
+        thread = threading.Thread(target=self.run_conversion,
+                                  args=(self.excel_path, selected_sheets, col, account,
+                                        self.save_folder, self.settings["headless"]),
+                                  daemon=True)
         thread.start()
         
-        # 타이머 시작
-        self.update_timer()
+        # 화면 갱신 시작
+        self.process_ui_events()
+    
+    def prewarm_browser(self, event=None):
+        """선택한 계정의 크롬을 백그라운드에서 미리 띄움 (설정에서 켠 경우)"""
+        account = self.account_var.get()
+        if not self.prewarm_var.get() or not account or self.is_running:
+            return
+        if self.engine is None or self.engine.start_time is not None:
+            self.engine = ConversionEngine(self.settings, self.config_dir, self.logger,
+                                           on_event=self.on_engine_event)
+        self.engine.prewarm(account, headless=self.settings["headless"])
+    
+    def toggle_prewarm(self):
+        """크롬 미리 실행 설정 저장 (끄면 이미 띄운 크롬은 닫음)"""
+        self.settings["prewarm_browser"] = bool(self.prewarm_var.get())
+        self.save_settings()
+        if self.settings["prewarm_browser"]:
+            self.prewarm_browser()
+        elif self.engine and not self.is_running:
+            threading.Thread(target=self.engine.cleanup, daemon=True).start()
+    
+    def on_close(self):
+        """창 닫기 (변환 전에 미리 띄운 크롬 정리)"""
+        if self.engine and not self.is_running:
+            self.engine.cleanup()
+        self.root.destroy()
     
     def update_timer(self):
         """경과 시간 업데이트"""
-        if self.is_running and self.start_time:
+        if self.start_time:
             elapsed = int(time.time() - self.start_time)
             minutes = elapsed // 60
             seconds = elapsed % 60
             self.stat_time.config(text=f"경과: {minutes:02d}:{seconds:02d}")
-            self.root.after(1000, self.update_timer)
     
-    def run_conversion(self):
-        """실제 변환 작업"""
+    def run_conversion(self, excel_path, sheet_names, col, account, save_folder, headless):
+        """실제 변환 작업 (엔진 실행, 작업 스레드)
+        
+        작업 스레드에서는 위젯을 직접 건드리지 않는다. 입력값은 start_conversion 이
+        메인 스레드에서 읽어 넘기고, 결과는 ui_events 에만 넣는다.
+        """
         try:
-            account = self.account_var.get()
-            col = self.col_entry.get().strip().upper()
-            selected_sheets = [self.sheet_listbox.get(i) for i in self.sheet_listbox.curselection()]
-            
-            self.logger.info(f"변환 시작 - 계정: {account}, 열: {col}, 시트: {selected_sheets}")
-            
-            # 크롬 드라이버 설정
-            self.setup_chrome_driver(account)
-            
-            total_links = 0
-            for sheet_name in selected_sheets:
-                sheet = self.wb[sheet_name]
-                for row in range(2, sheet.max_row + 1):
-                    cell_value = sheet[f"{col}{row}"].value
-                    if cell_value and str(cell_value).startswith("http"):
-                        total_links += 1
-            
-            self.progress_bar['maximum'] = total_links
-            self.logger.info(f"총 {total_links}개의 링크 발견")
-            
-            # 각 시트별로 처리
-            for sheet_name in selected_sheets:
-                if not self.is_running:
-                    break
-                
-                # 시트별 폴더 생성
-                sheet_folder = os.path.join(self.save_folder, sheet_name)
-                if not os.path.exists(sheet_folder):
-                    os.makedirs(sheet_folder)
-                    self.logger.info(f"폴더 생성: {sheet_folder}")
-                
-                sheet = self.wb[sheet_name]
-                self.logger.info(f"시트 '{sheet_name}' 처리 시작")
-                
-                for row in range(2, sheet.max_row + 1):
-                    # 일시정지 체크
-                    while self.is_paused and self.is_running:
-                        time.sleep(0.5)
-                    
-                    if not self.is_running:
-                        break
-                    
-                    cell_value = sheet[f"{col}{row}"].value
-                    
-                    if cell_value and str(cell_value).startswith("http"):
-                        url = str(cell_value)
-                        self.total_processed += 1
-                        
-                        # 진행 상태 업데이트
-                        self.progress_label.config(
-                            text=f"[{sheet_name}] {self.total_processed}/{total_links} 처리 중..."
-                        )
-                        self.progress_bar['value'] = self.total_processed
-                        
-                        # PDF 변환
-                        success = self.convert_to_pdf(url, sheet_folder, f"row_{row}")
-                        
-                        if success:
-                            self.total_success += 1
-                            self.logger.info(f"✓ 성공: {url} → row_{row}.pdf")
-                        else:
-                            self.total_failed += 1
-                            self.failed_items.append({
-                                'sheet': sheet_name,
-                                'row': row,
-                                'url': url
-                            })
-                            self.logger.error(f"✗ 실패: {url}")
-                        
-                        # 통계 업데이트
-                        self.stat_total.config(text=f"처리: {self.total_processed}")
-                        self.stat_success.config(text=f"성공: {self.total_success}")
-                        self.stat_failed.config(text=f"실패: {self.total_failed}")
-                        
-                        time.sleep(2)  # 안정성을 위한 대기
-            
-            # 완료 처리
-            self.finish_conversion()
-            
+            summary = self.engine.run(excel_path, sheet_names, col, account,
+                                      save_folder, headless=headless)
+            self.ui_events.put(("finished", summary))
         except Exception as e:
             self.logger.error(f"변환 중 오류: {str(e)}")
-            messagebox.showerror("오류", f"변환 중 오류가 발생했습니다: {str(e)}")
-        finally:
-            self.cleanup()
+            self.ui_events.put(("error", str(e)))
     
-    def setup_chrome_driver(self, account):
-        """크롬 드라이버 설정"""
-        chrome_options = Options()
-        
-        # 프로필 디렉토리 설정
-        profile_dir = os.path.join(os.path.expanduser("~"), "Documents", 
-                                   "Excel_to_PDF_Profiles", account.replace("@", "_at_"))
-        if not os.path.exists(profile_dir):
-            os.makedirs(profile_dir)
-        
-        chrome_options.add_argument(f"user-data-dir={profile_dir}")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
-        # PDF 인쇄 설정
-        prefs = {
-            "printing.print_preview_sticky_settings.appState": json.dumps({
-                "recentDestinations": [{
-                    "id": "Save as PDF",
-                    "origin": "local",
-                    "account": ""
-                }],
-                "selectedDestinationId": "Save as PDF",
-                "version": 2
-            }),
-            "savefile.default_directory": self.save_folder
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        chrome_options.add_argument("--kiosk-printing")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.logger.info(f"크롬 드라이버 시작 - 프로필: {profile_dir}")
+    def on_engine_event(self, event, data):
+        """엔진 진행 상황 수신 (작업자 스레드에서 호출, 큐에 넣기만 함)"""
+        self.ui_events.put((event, data))
     
-    def convert_to_pdf(self, url, folder, filename):
-        """URL을 PDF로 변환"""
-        try:
-            self.driver.get(url)
-            time.sleep(3)  # 페이지 로딩 대기
-            
-            # PDF로 인쇄
-            pdf_path = os.path.join(folder, f"{filename}.pdf")
-            result = self.driver.execute_cdp_cmd("Page.printToPDF", {
-                "printBackground": True,
-                "landscape": False
-            })
-            
-            with open(pdf_path, 'wb') as f:
-                f.write(base64.b64decode(result['data']))
-            
-            return True
-        except Exception as e:
-            self.logger.error(f"PDF 변환 실패: {url} - {str(e)}")
-            return False
-    
-    def finish_conversion(self):
-        """변환 완료 처리"""
-        self.is_running = False
-        
-        # 버튼 상태 복원
-        self.start_btn.config(state=NORMAL)
-        self.pause_btn.config(state=DISABLED, text="일시정지")
-        self.stop_btn.config(state=DISABLED)
-        
-        self.progress_label.config(text="완료!")
+    def process_ui_events(self):
+        """쌓인 이벤트를 일정 주기로 한꺼번에 화면에 반영 (메인 스레드)
         
-        # 결과 요약
-        elapsed = int(time.time() - self.start_time)
-        minutes = elapsed // 60
-        seconds = elapsed % 60
-        
-        result_msg = f"""
-변환 완료!
-
-총 처리: {self.total_processed}개
-성공: {self.total_success}개
-실패: {self.total_failed}개
-소요 시간: {minutes}분 {seconds}초
-
-저장 위치: {self.save_folder}
+        진행 이벤트는 마지막 것만 반영하므로 작업자 수나 처리 속도와
+        관계없이 화면 갱신은 주기당 한 번이다.
         """
+        latest_progress = None
+        finished = None
+        while True:
+            try:
+                event, data = self.ui_events.get_nowait()
+            except queue.Empty:
+                break
+            if event == "started":
+                self.progress_bar['maximum'] = data['total']
+            elif event == "progress":
+                latest_progress = data
+            elif event in ("finished", "error"):
+                finished = (event, data)
+        
+        if latest_progress:
+            data = latest_progress
+            # 진행 상태 업데이트 (일시정지 중에는 안내 문구 유지)
+            if not self.is_paused:
+                self.progress_label.config(
+                    text=f"[{data['sheet']}] {data['processed']}/{data['total']} 처리 중..."
+                )
+            self.progress_bar['value'] = data['processed']
+            
+            # 통계 업데이트
+            self.stat_total.config(text=f"처리: {data['processed']}")
+            self.stat_success.config(text=f"성공: {data['success']}")
+            self.stat_failed.config(text=f"실패: {data['failed']}")
         
-        self.logger.info("=" * 50)
-        self.logger.info(result_msg)
-        self.logger.info("=" * 50)
+        self.update_timer()
         
-        # 실패 항목 로그 저장
-        if self.failed_items:
-            fail_log_path = os.path.join(self.save_folder, "failed_items.txt")
-            with open(fail_log_path, 'w', encoding='utf-8') as f:
-                f.write("변환 실패 항목\n")
-                f.write("=" * 50 + "\n\n")
-                for item in self.failed_items:
-                    f.write(f"시트: {item['sheet']}\n")
-                    f.write(f"행: {item['row']}\n")
-                    f.write(f"URL: {item['url']}\n")
-                    f.write("-" * 50 + "\n")
-            
-            result_msg += f"\n\n실패 목록이 저장되었습니다:\n{fail_log_path}"
-            self.logger.info(f"실패 목록 저장: {fail_log_path}")
+        if finished:
+            event, data = finished
+            if event == "finished":
+                self.finish_conversion(data)
+            else:
+                self.is_running = False
+                self.reset_buttons()
+                messagebox.showerror("오류", f"변환 중 오류가 발생했습니다: {data}")
+            return
         
-        messagebox.showinfo("완료", result_msg)
+        interval = max(1, int(1000 / self.settings["ui_refresh_hz"]))
+        self.root.after(interval, self.process_ui_events)
     
-    def cleanup(self):
-        """리소스 정리"""
-        if self.driver:
-            try:
-                self.driver.quit()
-                self.logger.info("크롬 드라이버 종료")
-            except:
-                pass
+    def reset_buttons(self):
+        """버튼 상태 복원"""
+        self.start_btn.config(state=NORMAL)
+        self.pause_btn.config(state=DISABLED, text="일시정지")
+        self.stop_btn.config(state=DISABLED)
+    
+    def finish_conversion(self, summary):
+        """변환 완료 처리"""
+        self.is_running = False
+        self.reset_buttons()
+        self.progress_label.config(text="완료!")
         
-        # 크롬 프로세스 강제 종료
-        for proc in psutil.process_iter(['name']):
-            try:
-                if 'chrome' in proc.info['name'].lower():
-                    proc.kill()
-            except:
-                pass
+        messagebox.showinfo("완료", format_summary(summary))
 
 
 # 간단한 다이얼로그 (tkinter.simpledialog import 대체)
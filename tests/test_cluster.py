@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""분산 모드 작업 큐 시험 (크롬 없이 로컬 코디네이터와 HTTP 로 임대/만료/회수 확인)"""
+
+import time
+
+import pytest
+
+from excel_to_pdf_engine import LinkJob
+from excel_to_pdf_cluster import ClusterClient, Coordinator, LeaseQueue
+
+LEASE_SECONDS = 0.5
+KEY = "비밀키"
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    """링크 2개(같은 URL 의 행 2개 + 다른 URL 1개)를 넣은 큐와 실행 중인 코디네이터"""
+    workbook = str(tmp_path / "book.xlsx")
+    jobs = [
+        LinkJob("시트1", 2, "https://example.com/a", workbook),
+        LinkJob("시트1", 3, "https://example.com/a", workbook),
+        LinkJob("시트1", 4, "https://example.com/b", workbook),
+    ]
+    output = tmp_path / "pdf"
+    queue = LeaseQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=LEASE_SECONDS, max_attempts=3)
+    assert queue.add(jobs, lambda job: str(output / job.sheet / f"row_{job.row}.pdf")) == 3
+
+    coordinator = Coordinator(queue, "127.0.0.1", 0, key=KEY)
+    coordinator.start()
+    client = ClusterClient(f"http://127.0.0.1:{coordinator.server.server_address[1]}", KEY, timeout=5)
+    try:
+        yield queue, client, output
+    finally:
+        coordinator.close()
+        queue.close()
+
+
+def write_pdf(path):
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n%test\n")
+    return path
+
+
+def test_expired_lease_is_reclaimed_and_stale_upload_rejected(cluster, tmp_path):
+    queue, client, output = cluster
+
+    # 작업자 1이 첫 작업을 받은 뒤 응답 없이 임대 만료
+    state, first = client.claim("worker-1", "a@gmail.com")
+    assert state == "task" and first["url"] == "https://example.com/a"
+    assert queue.counts()["leased"] == 2
+    time.sleep(LEASE_SECONDS + 0.2)
+    assert queue.reclaim() == 1
+
+    # 회수된 작업은 다른 작업자에게 다시 나가고 시도 횟수가 늘어남
+    state, again = client.claim("worker-2", "b@gmail.com")
+    assert state == "task" and again["url"] == first["url"]
+    assert again["attempts"] == 2 and again["token"] != first["token"]
+
+    # 만료된 토큰으로 보낸 결과는 버리고, 새 임대의 결과는 같은 URL 의 모든 행에 저장
+    assert not client.upload(first["token"], write_pdf(str(tmp_path / "stale.pdf")))
+    assert client.upload(again["token"], write_pdf(str(tmp_path / "fresh.pdf")))
+    assert (output / "시트1" / "row_2.pdf").exists()
+    assert (output / "시트1" / "row_3.pdf").exists()
+
+    # 남은 작업을 끝내면 모두 완료
+    state, last = client.claim("worker-2", "b@gmail.com")
+    assert state == "task" and last["url"] == "https://example.com/b"
+    assert client.renew(last["token"])
+    assert client.upload(last["token"], write_pdf(str(tmp_path / "last.pdf")))
+    assert client.claim("worker-1", "a@gmail.com") == ("finished", None)
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 3, "failed": 0}
+
+
+def test_lease_expiry_fails_task_after_max_attempts(cluster):
+    queue, client, _ = cluster
+
+    for attempt in range(1, 4):
+        state, task = client.claim(f"worker-{attempt}", "a@gmail.com")
+        assert state == "task" and task["url"] == "https://example.com/a"
+        assert task["attempts"] == attempt
+        time.sleep(LEASE_SECONDS + 0.2)
+        queue.reclaim()
+
+    counts = queue.counts()
+    assert counts["failed"] == 2 and counts["pending"] == 1
+    items = [item for items in queue.failed_items().values() for item in items]
+    assert {item["kind"] for item in items} == {"lease_expired"}
+
+
+def test_rerun_only_requeues_current_jobs(tmp_path):
+    workbook = str(tmp_path / "book.xlsx")
+    output = tmp_path / "pdf"
+    path = lambda job: str(output / job.sheet / f"row_{job.row}.pdf")
+    db_path = str(tmp_path / "queue.sqlite3")
+
+    queue = LeaseQueue(db_path, lease_seconds=LEASE_SECONDS, max_attempts=1)
+    queue.add([LinkJob("시트1", 2, "https://example.com/old", workbook),
+               LinkJob("시트2", 2, "https://example.com/other", workbook)], path)
+    token = queue.claim("worker-1", "a@gmail.com")["token"]
+    assert queue.fail(token, "a@gmail.com", "other", "실패")
+    queue.close()
+
+    # 다시 실행: 시트1 의 URL 이 바뀌었고 시트2 는 고르지 않음
+    queue = LeaseQueue(db_path, lease_seconds=LEASE_SECONDS, max_attempts=1)
+    assert queue.add([LinkJob("시트1", 2, "https://example.com/new", workbook)], path) == 1
+    task = queue.claim("worker-1", "a@gmail.com")
+    assert task["url"] == "https://example.com/new"
+    assert queue.complete(task["token"], write_pdf(str(tmp_path / "new.pdf")))
+    assert queue.claim("worker-1", "a@gmail.com") is None and queue.finished()
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+    assert not (output / "시트2").exists()
+    queue.close()
+
+
+def test_denied_task_fails_when_other_account_leaves(cluster):
+    queue, client, _ = cluster
+
+    # 다른 계정(b)의 작업자가 살아 있으면 권한 없음 작업은 그쪽으로 넘어감
+    state, other = client.claim("worker-b", "b@gmail.com")
+    assert state == "task" and other["url"] == "https://example.com/a"
+    state, task = client.claim("worker-a", "a@gmail.com")
+    assert state == "task" and task["url"] == "https://example.com/b"
+    assert queue.fail(task["token"], "a@gmail.com", "access_denied", "권한 없음")
+    assert queue.counts()["pending"] == 1
+
+    # b 의 작업자가 사라지면 더 시도할 계정이 없으므로 권한 없음으로 실패
+    assert client.renew(task["token"]) is False
+    time.sleep(2 * LEASE_SECONDS + 0.2)
+    queue.reclaim()
+    items = queue.failed_items()
+    assert [item["kind"] for items in items.values() for item in items if item["row"] == 4] == ["access_denied"]